@@ -1,9 +1,56 @@
 # backend/app.py
-from flask import Flask, render_template, request, jsonify, redirect, url_for
-from backend.models import db, User, Restaurant, MenuItem, PaymentMethod, Order, OrderItem
-from backend.db_init import seed_data
+from flask import (
+    Flask, Response, render_template, request, jsonify, redirect, url_for,
+    stream_with_context
+)
+from backend.models import (
+    db, User, Restaurant, PaymentMethod, Order, OrderItem, OrderArchive,
+    OrderItemArchive
+)
+from backend.archive import archived_until
+from backend.assets import init_assets
+from backend.auth import role_or_admin, role_required
+from backend.cart import (
+    CartError, add_item, adjust_total, apply_ops, open_cart, order_total,
+    parse_line, resolve_restaurant
+)
+from backend.catalog import (
+    catalog_cache, catalog_versions, etag_for, init_catalog_cache
+)
+from backend.changes import (
+    CHANGE_SEQ_HEADER, current_change_seq, current_positions, format_positions,
+    parse_positions
+)
+from backend.database import configure_database, install_sqlite_tuning, write_transaction
+from backend.cli import assets_cli, db_cli
+from backend.export import export_response
+from backend.instrumentation import init_instrumentation
+from backend.passwords import (
+    DEFAULT_HASH_METHOD, PasswordPoolBusy, init_password_pool, needs_rehash,
+    password_pool
+)
+from backend.principals import init_principal_cache, principal_cache
+from backend.profiling import init_profiling
+from backend.reports import ReportError, merge_sales_reports, record_status_change, sales_report
+from backend.search import match_expression, search_menu
+from backend.serializers import (
+    dumps, init_serializers, order_json, payment_method_json, restaurant_encoder
+)
+from backend.sharding import (
+    configure_sharding, fan_out, init_sharding, route_to_id, shards_for, use_shard,
+    user_shards
+)
+from backend.pagination import (
+    NEXT_CURSOR_HEADER, PaginationError, datetime_arg, decode_cursor,
+    encode_cursor, int_arg, page_limit, request_fields
+)
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
+from sqlalchemy import tuple_
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from datetime import datetime
 import os
+import threading
+import time
 
 
 def create_app():
@@ -13,20 +60,80 @@ def create_app():
         static_folder="../frontend/static"
     )
 
-    # Database
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///foodapp.db'
+    # Database (URL, pragmas and pool from the environment)
+    configure_database(app)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Optional per-country database files (backend/sharding.py)
+    configure_sharding(app)
+
     # Secret key (Render will set env variable)
     app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY", "dev-secret")
 
-    db.init_app(app)
-
-
-    with app.app_context():
-        db.create_all()
-        seed_data()
+    # Order change stream: how long one SSE response stays open (the
+    # browser reconnects with Last-Event-ID) and how often it polls
+    app.config.setdefault("ORDER_STREAM_SECONDS", float(os.environ.get("ORDER_STREAM_SECONDS", 25)))
+    app.config.setdefault("ORDER_STREAM_POLL", float(os.environ.get("ORDER_STREAM_POLL", 1.0)))
+    # Each open stream holds a request thread for its whole duration, so
+    # only a quarter of a worker's threads may stream; clients over the cap
+    # get 503 and poll /api/myorders?since= instead
+    threads = int(os.environ.get("GUNICORN_THREADS", 1))
+    app.config.setdefault("ORDER_STREAM_MAX", int(os.environ.get("ORDER_STREAM_MAX", threads // 4)))
+
+    # Login: password hashing runs on a bounded pool; hashes made with other
+    # parameters are upgraded to PASSWORD_HASH_METHOD on the next login
+    app.config.setdefault("PASSWORD_HASH_METHOD", os.environ.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD))
+    app.config.setdefault("PASSWORD_WORKERS", int(os.environ.get("PASSWORD_WORKERS", 2)))
+    app.config.setdefault("PASSWORD_QUEUE", int(os.environ.get("PASSWORD_QUEUE", 8)))
+    app.config.setdefault("PRINCIPAL_CACHE_TTL", float(os.environ.get("PRINCIPAL_CACHE_TTL", 30)))
+
+    # Placed/cancelled orders older than this move to the archive tables
+    # (`flask db archive-orders`)
+    app.config.setdefault("ORDER_ARCHIVE_DAYS", float(os.environ.get("ORDER_ARCHIVE_DAYS", 180)))
+
+    # Fingerprinted static files, built by `flask assets build`
+    app.config.setdefault("ASSET_DIST", os.environ.get("ASSET_DIST", os.path.join(app.static_folder, "dist")))
+
+    # Gzip JSON responses of at least COMPRESS_MIN_SIZE bytes (backend/serializers.py)
+    app.config.setdefault("COMPRESSION", os.environ.get("COMPRESSION", "1") == "1")
+    app.config.setdefault("COMPRESS_MIN_SIZE", int(os.environ.get("COMPRESS_MIN_SIZE", 1024)))
+    app.config.setdefault("COMPRESS_LEVEL", int(os.environ.get("COMPRESS_LEVEL", 1)))
+
+    # In-process catalog cache (entries per worker, version in the DB)
+    app.config.setdefault("CATALOG_CACHE_SIZE", int(os.environ.get("CATALOG_CACHE_SIZE", 256)))
+    app.config.setdefault("CATALOG_CACHE_BYTES", int(os.environ.get("CATALOG_CACHE_BYTES", 64 * 1024 * 1024)))
+
+    # Opt-in SQL/timing instrumentation and /metrics (backend/instrumentation.py)
+    app.config.setdefault("INSTRUMENTATION", os.environ.get("INSTRUMENTATION", "0") == "1")
+    app.config.setdefault("N_PLUS_ONE_THRESHOLD", int(os.environ.get("N_PLUS_ONE_THRESHOLD", 5)))
+    app.config.setdefault("METRICS_TOKEN", os.environ.get("METRICS_TOKEN"))
+
+    # Opt-in sampling profiler for slow requests (backend/profiling.py)
+    app.config.setdefault("PROFILING", os.environ.get("PROFILING", "0") == "1")
+    app.config.setdefault("PROFILE_SAMPLE_RATE", float(os.environ.get("PROFILE_SAMPLE_RATE", 0.0)))
+    app.config.setdefault("PROFILE_SLOW_MS", float(os.environ.get("PROFILE_SLOW_MS", 0)))
+    app.config.setdefault("PROFILE_ENDPOINTS", os.environ.get("PROFILE_ENDPOINTS", ""))
+    app.config.setdefault("PROFILE_INTERVAL_MS", float(os.environ.get("PROFILE_INTERVAL_MS", 5)))
+    app.config.setdefault("PROFILE_MAX_FILES", int(os.environ.get("PROFILE_MAX_FILES", 50)))
+    app.config.setdefault("PROFILE_DIR", os.environ.get("PROFILE_DIR"))
+
+    app.extensions["order_streams"] = threading.BoundedSemaphore(max(app.config["ORDER_STREAM_MAX"], 1))
 
+    db.init_app(app)
+    init_sharding(app)
+    install_sqlite_tuning(app)
+    init_catalog_cache(app)
+    init_password_pool(app)
+    init_principal_cache(app)
+    init_serializers(app)
+    init_instrumentation(app)
+    init_profiling(app)
+    init_assets(app)
+
+    # Schema and seed data are provisioned with `flask db init` (backend/cli.py),
+    # so creating the app touches neither the database nor password hashing
+    app.cli.add_command(db_cli)
+    app.cli.add_command(assets_cli)
 
     # ----------------------------------------------------
     # LOGIN MANAGER
@@ -37,7 +144,21 @@ def create_app():
 
     @login_manager.user_loader
     def load_user(uid):
-        return User.query.get(int(uid))
+        # Cached id -> role/country; no User row load on most requests
+        return principal_cache().get(int(uid))
+
+    @app.errorhandler(PaginationError)
+    def pagination_error(e):
+        return jsonify({"error": str(e)}), 400
+
+    @app.errorhandler(ReportError)
+    def report_error(e):
+        return jsonify({"error": str(e)}), 400
+
+    @app.errorhandler(CartError)
+    def cart_error(e):
+        db.session.rollback()
+        return jsonify({"error": e.message}), e.status
 
     # ----------------------------------------------------
     # UI ROUTES
@@ -56,7 +177,25 @@ def create_app():
         password = request.form.get("password")
 
         user = User.query.filter_by(username=username).first()
-        if user and user.check_password(password):
+        try:
+            valid = user is not None and password_pool().verify(user.password_hash, password or "")
+        except PasswordPoolBusy:
+            resp = app.make_response((
+                render_template("login.html", error="Too many logins right now, please retry"),
+                503
+            ))
+            resp.headers["Retry-After"] = "1"
+            return resp
+
+        if valid:
+            method = app.config["PASSWORD_HASH_METHOD"]
+            if needs_rehash(user.password_hash, method):
+                try:
+                    user.password_hash = password_pool().hash(password, method)
+                    db.session.commit()
+                except PasswordPoolBusy:
+                    pass  # keep the old hash; upgrade on a later login
+
             login_user(user)
             return redirect(url_for("index"))
 
@@ -75,90 +214,199 @@ def create_app():
     @login_required
     def api_restaurants():
         qcountry = request.args.get("country")
-        query = Restaurant.query
+        fields = request_fields(
+            allowed=("id", "name", "country", "menu"),
+            default=("id", "name", "country", "menu")
+        )
+        limit = page_limit()
+        cursor = request.args.get("cursor")
 
         # Restrict managers & members to their own country
         if current_user.role in ("manager", "member"):
-            query = query.filter_by(country=current_user.country)
-        elif qcountry:
-            query = query.filter_by(country=qcountry)
-
-        restaurants = query.all()
-
-        return jsonify([
-            {
-                "id": r.id,
-                "name": r.name,
-                "country": r.country,
-                "menu": [
-                    {"id": m.id, "name": m.name, "price": m.price}
-                    for m in r.menu_items
-                ]
-            }
-            for r in restaurants
-        ])
+            country = current_user.country
+        else:
+            country = qcountry or None
+
+        # Cached render for this exact listing at the current catalog version
+        shards = shards_for(country)
+        key = ("list", country, tuple(sorted(fields)), cursor, limit)
+        version = catalog_versions(shards)
+        etag = etag_for(key, version)
+
+        # Weak match: compressed responses carry the ETag as W/"..."
+        if request.if_none_match.contains_weak(etag):
+            resp = Response(status=304)
+        else:
+            entry = catalog_cache().get(key, version)
+            if entry is None:
+                entry = _render_restaurants(country, fields, cursor, limit, shards)
+                catalog_cache().put(key, version, entry, len(entry[0]))
+                cache_status = "miss"
+            else:
+                cache_status = "hit"
+
+            body, next_cursor = entry
+            resp = Response(body, mimetype="application/json")
+            resp.headers["X-Catalog-Cache"] = cache_status
+            if next_cursor:
+                resp.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+        resp.set_etag(etag)
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+
+    def _render_restaurants(country, fields, cursor, limit, shards):
+        after_id = decode_cursor(cursor, 1)[0] if cursor else None
+
+        # Shards hold increasing id ranges, so shard order is id order
+        parts = fan_out(lambda shard: _restaurant_rows(country, fields, after_id, limit), shards)
+        rows = [row for part in parts for row in part]
+
+        has_more = bool(limit) and len(rows) > limit
+        if limit:
+            rows = rows[:limit]
+
+        next_cursor = encode_cursor(rows[-1][0]) if has_more else None
+        return app.json.encode([row for _, row in rows]), next_cursor
+
+    def _restaurant_rows(country, fields, after_id, limit):
+        """(id, row) pairs of one shard, at most limit + 1."""
+        query = Restaurant.query
+        if country:
+            query = query.filter_by(country=country)
+
+        # Keyset pagination on id
+        if after_id is not None:
+            query = query.filter(Restaurant.id > after_id)
+        query = query.order_by(Restaurant.id)
+
+        # Menus are fetched in one extra IN query, never per restaurant
+        columns = [getattr(Restaurant, f) for f in ("name", "country") if f in fields]
+        query = query.options(load_only(Restaurant.id, *columns))
+        if "menu" in fields:
+            query = query.options(selectinload(Restaurant.menu_items))
+
+        if limit:
+            restaurants = query.limit(limit + 1).all()
+        else:
+            restaurants = query.all()
+
+        encode = restaurant_encoder(tuple(sorted(fields)))
+        return [(r.id, encode(r)) for r in restaurants]
+
+    # ----------------------------------------------------
+    # MENU SEARCH
+    # ----------------------------------------------------
+    @app.route("/api/search", methods=["GET"])
+    @login_required
+    def api_search():
+        # Managers and members only search their own country
+        if current_user.role == "admin":
+            country = request.args.get("country") or None
+        else:
+            country = current_user.country
+
+        match = match_expression(request.args.get("q", ""), country)
+        if match is None:
+            return jsonify({"error": "Missing q"}), 400
+
+        limit = page_limit(default=20, maximum=100)
+        after = None
+        cursor = request.args.get("cursor")
+        if cursor:
+            score, mid = decode_cursor(cursor, 2)
+            try:
+                after = (float(score), int(mid))
+            except (TypeError, ValueError):
+                raise PaginationError("Invalid cursor")
+
+        # Best matches first; admins without ?country search every shard
+        parts = fan_out(lambda shard: search_menu(match, country, after, limit + 1), shards_for(country))
+        rows = sorted((r for part in parts for r in part), key=lambda r: (r["score"], r["menu_item_id"]))
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        resp = jsonify(rows)
+        if has_more:
+            resp.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1]["score"], rows[-1]["menu_item_id"])
+        return resp
+
+    @app.route("/api/catalog/stats", methods=["GET"])
+    @login_required
+    @role_required(["admin"])
+    def api_catalog_stats():
+        return jsonify(catalog_cache().stats())
 
     # ----------------------------------------------------
     # ADD TO CART
     # ----------------------------------------------------
     @app.route("/api/cart/add", methods=["POST"])
+    @write_transaction
     @login_required
     def api_cart_add():
         data = request.get_json(silent=True) or {}
 
         restaurant_id = data.get("restaurant_id")
         menu_item_id = data.get("menu_item_id")
-        qty = int(data.get("qty", 1))
 
         if not restaurant_id or not menu_item_id:
             return jsonify({"error": "Missing fields"}), 400
 
-        restaurant = Restaurant.query.get(restaurant_id)
-        if not restaurant:
-            return jsonify({"error": "Restaurant not found"}), 404
+        menu_item_id, qty = parse_line(menu_item_id, data.get("qty", 1))
+        restaurant = resolve_restaurant(current_user, restaurant_id)
 
-        # Restrict to country
-        if current_user.role in ("manager", "member") and restaurant.country != current_user.country:
-            return jsonify({"error": "Country restriction"}), 403
+        # One transaction: find/create cart, merge the line, bump the total
+        cart = open_cart(current_user, restaurant)
+        adjust_total(cart, add_item(cart, restaurant, menu_item_id, qty))
+        order_id = cart.id
+        db.session.commit()
 
-        # Existing cart?
-        cart = Order.query.filter_by(
-            user_id=current_user.id,
-            restaurant_id=restaurant_id,
-            status="cart"
-        ).first()
-
-        # Create cart if none exists
-        if not cart:
-            cart = Order(
-                user_id=current_user.id,
-                restaurant_id=restaurant_id,
-                status="cart",
-                country=restaurant.country,
-                added_by=current_user.username
-            )
-            db.session.add(cart)
-            db.session.commit()
+        # Return the updated cart so clients do not refetch every order
+        (cart,) = _load_orders([order_id])
+        return jsonify({"message": "Added", "order_id": order_id, "cart": order_json(cart)})
 
-        item = MenuItem.query.get(menu_item_id)
-        if not item:
-            return jsonify({"error": "Invalid item"}), 400
+    # ----------------------------------------------------
+    # CURRENT CARTS
+    # ----------------------------------------------------
+    @app.route("/api/cart", methods=["GET"])
+    @login_required
+    def api_cart():
+        # Served by ix_order_user_status_restaurant. Admins may have carts
+        # in every country shard.
+        def carts(shard):
+            return [
+                order_json(o) for o in
+                Order.query.options(*ORDER_GRAPH)
+                .filter_by(user_id=current_user.id, status="cart")
+                .order_by(Order.id)
+                .all()
+            ]
+        parts = fan_out(carts, user_shards(current_user))
+        return jsonify([cart for part in parts for cart in part])
 
-        order_item = OrderItem(order_id=cart.id, menu_item_id=item.id, qty=qty)
-        db.session.add(order_item)
+    # ----------------------------------------------------
+    # BATCH CART MUTATIONS
+    # ----------------------------------------------------
+    @app.route("/api/cart/batch", methods=["POST"])
+    @write_transaction
+    @login_required
+    def api_cart_batch():
+        data = request.get_json(silent=True) or {}
 
-        # Update total
-        db.session.flush()
-        cart.total = sum(i.menu_item.price * i.qty for i in cart.items)
+        # All ops succeed or none do
+        cart_ids = apply_ops(current_user, data.get("ops"))
         db.session.commit()
 
-        return jsonify({"message": "Added", "order_id": cart.id})
+        carts = _load_orders(cart_ids)
+        return jsonify({"message": "Updated", "carts": [order_json(o) for o in carts]})
 
     # ----------------------------------------------------
     # CHECKOUT
     # ----------------------------------------------------
     @app.route("/api/checkout", methods=["POST"])
+    @write_transaction
     @login_required
+    @role_or_admin(["manager"])
     def api_checkout():
         data = request.get_json(silent=True) or {}
 
@@ -168,81 +416,107 @@ def create_app():
         if not order_id or not pm_id:
             return jsonify({"error": "Missing fields"}), 400
 
-        order = Order.query.get(order_id)
-
-        if not order or order.user_id != current_user.id:
+        # Scoped by the policy: other countries' orders are not found
+        if not route_to_id(order_id):
+            return jsonify({"error": "Order not found"}), 404
+        order = Order.query.filter_by(id=order_id, user_id=current_user.id).first()
+        if not order:
             return jsonify({"error": "Order not found"}), 404
 
-        # Members cannot checkout
-        if current_user.role == "member":
-            return jsonify({"error": "Members cannot checkout"}), 403
-
-        # Country lock
-        if current_user.role == "manager" and order.country != current_user.country:
-            return jsonify({"error": "Country restriction"}), 403
+        old_status, old_total = order.status, order.total
 
-        # Recalculate total
-        order.total = sum(i.menu_item.price * i.qty for i in order.items)
+        # Recalculate total from the line price snapshots
+        order.total = order_total(order.id)
 
-        # Validate payment method
-        pm = PaymentMethod.query.get(pm_id)
+        # Validate payment method (scoped to the user's own, except for admins)
+        pm = PaymentMethod.query.filter_by(id=pm_id).first()
         if not pm:
             return jsonify({"error": "Invalid payment method"}), 404
 
-        if pm.user_id != current_user.id and current_user.role != "admin":
-            return jsonify({"error": "Not allowed"}), 403
-
-        # Place order
+        # Place order; the sales rollup moves in the same transaction
         order.status = "placed"
+        record_status_change(order, old_status, old_total)
+        order_id = order.id
         db.session.commit()
 
-        return jsonify({"message": "Order placed", "order_id": order.id})
+        (order,) = _load_orders([order_id])
+        return jsonify({"message": "Order placed", "order_id": order_id, "order": order_json(order)})
 
     # ----------------------------------------------------
     # CANCEL ORDER
     # ----------------------------------------------------
     @app.route("/api/order/<int:oid>/cancel", methods=["POST"])
+    @write_transaction
     @login_required
+    @role_or_admin(["manager"])
     def api_cancel(oid):
-        order = Order.query.get(oid)
+        # Scoped by the policy: other countries' orders are not found
+        if not route_to_id(oid):
+            return jsonify({"error": "Not found"}), 404
+        order = Order.query.filter_by(id=oid).first()
         if not order:
             return jsonify({"error": "Not found"}), 404
 
-        if current_user.role == "member":
-            return jsonify({"error": "Members cannot cancel"}), 403
-
-        if current_user.role == "manager" and order.country != current_user.country:
-            return jsonify({"error": "Country restricted"}), 403
-
+        old_status, old_total = order.status, order.total
         order.status = "cancelled"
         order.cancelled_by = current_user.username
+        record_status_change(order, old_status, old_total)
         db.session.commit()
 
-        return jsonify({"message": "Cancelled"})
+        (order,) = _load_orders([oid])
+        return jsonify({"message": "Cancelled", "order": order_json(order)})
+
+    # ----------------------------------------------------
+    # SALES REPORTS (admin: any country, manager: own country)
+    # ----------------------------------------------------
+    @app.route("/api/reports/sales", methods=["GET"])
+    @login_required
+    @role_or_admin(["manager"])
+    def api_sales_report():
+        if current_user.role == "admin":
+            country = request.args.get("country") or None
+        else:
+            country = current_user.country
+
+        since = datetime_arg("since")
+        until = datetime_arg("until")
+        status = request.args.get("status")
+        group = [g for g in request.args.get("group", "day,status").split(",") if g]
+
+        filters = dict(
+            country=country,
+            since=since.date() if since else None,
+            until=until.date() if until else None,
+            statuses=status.split(",") if status else None,
+        )
+        # Admin reports over every country read all shards in parallel
+        parts = fan_out(
+            lambda shard: (sales_report(group=group, **filters), sales_report(group=["status"], **filters)),
+            shards_for(country)
+        )
+        rows = merge_sales_reports([p[0] for p in parts], group)
+        totals = {
+            r["status"]: {"orders": r["orders"], "revenue": r["revenue"]}
+            for r in merge_sales_reports([p[1] for p in parts], ["status"])
+        }
+        return jsonify({"country": country, "group": group, "rows": rows, "totals": totals})
 
     # ----------------------------------------------------
     # PAYMENT METHODS
     # FIXED GET HANDLER (no JSON parsing)
     # ----------------------------------------------------
     @app.route("/api/payment-methods", methods=["GET", "POST"])
+    @write_transaction
     @login_required
     def api_payment_methods():
 
         # GET (list)
         if request.method == "GET":
             if current_user.role == "admin" and request.args.get("all") == "1":
-                pms = PaymentMethod.query.all()
-            else:
-                pms = PaymentMethod.query.filter_by(user_id=current_user.id).all()
+                return export_response(PaymentMethod.query, PaymentMethod.id, payment_method_json)
 
-            return jsonify([
-                {
-                    "id": p.id,
-                    "method_name": p.method_name,
-                    "card_last4": p.card_last4
-                }
-                for p in pms
-            ])
+            pms = PaymentMethod.query.filter_by(user_id=current_user.id).all()
+            return jsonify([payment_method_json(p) for p in pms])
 
         # POST → Add new method
         data = request.get_json(silent=True) or {}
@@ -267,45 +541,240 @@ def create_app():
     @app.route("/api/myorders", methods=["GET"])
     @login_required
     def api_myorders():
+        everything = current_user.role == "admin" and request.args.get("all") == "1"
+
+        # ?since=<integer> is a change-feed position; ?since=<ISO date> is a
+        # created_at filter (below)
+        shards = user_shards(current_user)
+        since_arg = request.args.get("since", "")
+        positions = parse_positions(since_arg, len(shards))
+        if positions is not None:
+            return _order_changes(everything, shards, positions)
+
+        # Full admin listing is streamed in id order, in constant memory
+        if everything:
+            sources = []
+            for shard in shards:
+                query = _filter_orders(_orders_in_scope(current_user, everything))
+                archive = _filter_orders(_orders_in_scope(current_user, everything, OrderArchive), OrderArchive)
+                sources += [
+                    (query.options(*ORDER_GRAPH), Order.id, shard),
+                    (archive.options(*ARCHIVE_GRAPH), OrderArchive.id, shard),
+                ]
+            (query, id_column, shard), *extra = sources
+            return export_response(query, id_column, order_json, extra=extra, shard=shard)
+
+        limit = page_limit(default=50, maximum=200)
+        cursor = request.args.get("cursor")
+
+        # Keyset pagination, newest first
+        after = None
+        if cursor:
+            created_at, oid = decode_cursor(cursor, 2)
+            try:
+                after = (datetime.fromisoformat(created_at), oid)
+            except (TypeError, ValueError):
+                raise PaginationError("Invalid cursor")
+
+        # One page per shard, merged by (created_at, id)
+        parts = fan_out(lambda shard: _order_page(after, limit), shards)
+        rows = sorted((row for _, page in parts for row in page), key=lambda r: r[:2], reverse=True)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        resp = jsonify([order for _, _, order in rows])
+        resp.headers[CHANGE_SEQ_HEADER] = format_positions([seq for seq, _ in parts])
+        if has_more:
+            created_at, oid, _ = rows[-1]
+            resp.headers[NEXT_CURSOR_HEADER] = encode_cursor(created_at.isoformat(), oid)
+        return resp
+
+    def _order_page(after, limit):
+        """(change seq, [(created_at, id, order json)]) for up to limit + 1
+        orders of the current shard."""
+        query = _filter_orders(_orders_in_scope(current_user))
+        archive = _filter_orders(_orders_in_scope(current_user, model=OrderArchive), OrderArchive)
+
+        # Read before listing so no later change can be missed by the client
+        seq = current_change_seq()
+
+        if after:
+            query = query.filter(tuple_(Order.created_at, Order.id) < after)
+            archive = archive.filter(tuple_(OrderArchive.created_at, OrderArchive.id) < after)
+
+        # Whole order graph in three statements
+        orders = (
+            query.options(*ORDER_GRAPH)
+            .order_by(Order.created_at.desc(), Order.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
 
-        # Admin view everything
-        if current_user.role == "admin" and request.args.get("all") == "1":
-            orders = Order.query.all()
-        else:
-            if current_user.role in ("manager", "member"):
-                orders = Order.query.join(Restaurant).filter(
-                    Restaurant.country == current_user.country
-                ).all()
-            else:
-                orders = Order.query.filter_by(user_id=current_user.id).all()
-
-        return jsonify([
-            {
-                "id": o.id,
-                "restaurant": o.restaurant.name if o.restaurant else None,
-                "restaurant_id": o.restaurant_id,
-                "country": o.country,
-                "status": o.status,
-                "total": o.total,
-                "items": [
-                    {
-                        "name": i.menu_item.name,
-                        "qty": i.qty,
-                        "price": i.menu_item.price
-                    }
-                    for i in o.items
-                ],
-                "added_by": o.added_by,
-                "cancelled_by": o.cancelled_by,
-                "created_at": o.created_at.isoformat()
-            }
-            for o in orders
-        ])
+        # The archive holds nothing newer than its newest order: read it only
+        # when this page runs out of hot rows or pages past that mark
+        until = archived_until()
+        since = datetime_arg("since")
+        reaches_archive = until is not None and (len(orders) <= limit or orders[-1].created_at <= until)
+        if reaches_archive and not (since and since > until):
+            orders += (
+                archive.options(*ARCHIVE_GRAPH)
+                .order_by(OrderArchive.created_at.desc(), OrderArchive.id.desc())
+                .limit(limit + 1)
+                .all()
+            )
+            orders.sort(key=lambda o: (o.created_at, o.id), reverse=True)
+
+        return seq, [(o.created_at, o.id, order_json(o)) for o in orders[:limit + 1]]
+
+    def _order_changes(everything, shards, positions):
+        """Orders in scope changed after `positions`, oldest change first
+        (per shard).
+
+        X-Change-Seq is the value to pass as the next ?since=; a full page
+        (limit rows from a shard) means more changes are waiting.
+        """
+        limit = page_limit(default=200, maximum=500)
+
+        def changes(since):
+            orders = (
+                _orders_in_scope(current_user, everything)
+                .filter(Order.change_seq > since)
+                .options(*ORDER_GRAPH)
+                .order_by(Order.change_seq)
+                .limit(limit)
+                .all()
+            )
+            return (orders[-1].change_seq if orders else since), [order_json(o) for o in orders]
+
+        since = dict(zip(shards, positions))
+        parts = fan_out(lambda shard: changes(since[shard]), shards)
+
+        resp = jsonify([order for _, page in parts for order in page])
+        resp.headers[CHANGE_SEQ_HEADER] = format_positions([seq for seq, _ in parts])
+        return resp
+
+    # ----------------------------------------------------
+    # ORDER CHANGE STREAM (SSE)
+    # ----------------------------------------------------
+    @app.route("/api/orders/stream", methods=["GET"])
+    @login_required
+    def api_orders_stream():
+        shards = user_shards(current_user)
+        last = request.headers.get("Last-Event-ID") or request.args.get("since") or ""
+        last = parse_positions(last, len(shards)) or current_positions(shards)
+
+        duration = app.config["ORDER_STREAM_SECONDS"]
+        poll = app.config["ORDER_STREAM_POLL"]
+        user = current_user._get_current_object()
+
+        def events(last):
+            deadline = time.monotonic() + duration
+            quiet_since = time.monotonic()
+            yield "retry: 3000\n\n"
+
+            while time.monotonic() < deadline:
+                # Cheap single-row read per shard; only query orders when it moved
+                changed = []
+                for index, shard in enumerate(shards):
+                    with use_shard(shard):
+                        if current_change_seq() <= last[index]:
+                            continue
+                        orders = (
+                            _orders_in_scope(user)
+                            .filter(Order.change_seq > last[index])
+                            .options(*ORDER_GRAPH)
+                            .order_by(Order.change_seq)
+                            .limit(100)
+                            .all()
+                        )
+                        changed += [(index, o.change_seq, order_json(o)) for o in orders]
+
+                for index, seq, order in changed:
+                    last[index] = seq
+                    yield f"id: {format_positions(last)}\nevent: order\ndata: {dumps(order).decode()}\n\n"
+                if changed:
+                    quiet_since = time.monotonic()
+                elif time.monotonic() - quiet_since > 15:
+                    yield ": keepalive\n\n"
+                    quiet_since = time.monotonic()
+
+                # Do not hold a connection (or a read snapshot) while idle
+                db.session.close()
+                time.sleep(poll)
+
+        # One of the worker's few stream slots, or 503 (the client polls)
+        slots = app.extensions["order_streams"]
+        if app.config["ORDER_STREAM_MAX"] < 1 or not slots.acquire(blocking=False):
+            resp = jsonify({"error": "Too many order streams, poll /api/myorders?since="})
+            resp.headers["Retry-After"] = "30"
+            return resp, 503
+
+        resp = Response(stream_with_context(events(last)), mimetype="text/event-stream")
+        resp.headers["Cache-Control"] = "no-cache"
+        resp.headers["X-Accel-Buffering"] = "no"
+        # Closed by the server when the stream ends or the client goes away
+        resp.call_on_close(slots.release)
+        return resp
 
     # END create_app
     return app
 
 
 # ----------------------------------------------------
-# LOCAL RUN
+# ORDER SERIALIZATION
 # ----------------------------------------------------
+# Eager-load options for the full order graph (restaurant, lines, menu items)
+ORDER_GRAPH = (
+    joinedload(Order.restaurant),
+    selectinload(Order.items).joinedload(OrderItem.menu_item),
+)
+
+
+# Same graph for archived orders
+ARCHIVE_GRAPH = (
+    joinedload(OrderArchive.restaurant),
+    selectinload(OrderArchive.items).joinedload(OrderItemArchive.menu_item),
+)
+
+
+def _orders_in_scope(user, everything=False, model=Order):
+    """Base query on `model` (Order or OrderArchive) for what `user`
+    lists. Managers and members are limited to their country by the
+    policy (backend/policy.py); admins list their own orders unless they
+    ask for everything."""
+    if user.role == "admin" and not everything:
+        return model.query.filter_by(user_id=user.id)
+    return model.query
+
+
+def _filter_orders(query, model=Order):
+    """Apply the server-side ?status, ?restaurant_id, ?since, ?until filters."""
+    status = request.args.get("status")
+    if status:
+        query = query.filter(model.status.in_(status.split(",")))
+
+    restaurant_id = int_arg("restaurant_id")
+    if restaurant_id is not None:
+        query = query.filter(model.restaurant_id == restaurant_id)
+
+    since = datetime_arg("since")
+    if since:
+        query = query.filter(model.created_at >= since)
+
+    until = datetime_arg("until")
+    if until:
+        query = query.filter(model.created_at < until)
+
+    return query
+
+
+def _load_orders(order_ids):
+    if not order_ids:
+        return []
+    return (
+        Order.query.options(*ORDER_GRAPH)
+        .filter(Order.id.in_(order_ids))
+        .order_by(Order.id)
+        .all()
+    )
+
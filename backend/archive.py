@@ -0,0 +1,101 @@
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from backend.models import db, Order, OrderArchive, OrderItem, OrderItemArchive
+
+
+# ------------------------------------------------------------
+# HOT / COLD ORDER STORAGE
+# ------------------------------------------------------------
+# Placed and cancelled orders created more than ORDER_ARCHIVE_DAYS ago
+# are moved to order_archive / order_item_archive by
+# `flask db archive-orders`. Each batch is one short write transaction
+# (copy, then delete, by id) followed by a pause, so live requests get
+# the write lock between batches.
+#
+# A listing only has to read the archive once it pages past the newest
+# archived order (or runs out of hot rows). That high-water mark is read
+# from the archive itself, not derived from ORDER_ARCHIVE_DAYS, which may
+# have changed since the last run. See api_myorders.
+#
+# SQLite reuses the id of a deleted max row. Orders are never deleted
+# outside this job, which never moves the newest one. Order lines are
+# (removing a cart line), so archived lines get ids of their own instead
+# of keeping the order_item id.
+
+ARCHIVE_STATUSES = ("placed", "cancelled")
+
+ORDER_COLUMNS = [
+    "id", "user_id", "restaurant_id", "status", "total", "created_at",
+    "country", "added_by", "cancelled_by", "change_seq",
+]
+ORDER_ITEM_COLUMNS = ["order_id", "menu_item_id", "qty", "unit_price"]
+
+
+def archive_cutoff(days=None):
+    """Orders created before this are archived (or may already be)."""
+    if days is None:
+        days = current_app.config["ORDER_ARCHIVE_DAYS"]
+    return datetime.utcnow() - timedelta(days=days)
+
+
+def archived_until():
+    """created_at of the newest archived order in scope, or None."""
+    return db.session.execute(select(func.max(OrderArchive.created_at))).scalar()
+
+
+def _archive_batch(conn, ids, cutoff):
+    # Re-check the conditions: an order may have changed since it was picked
+    moved = select(*(Order.__table__.c[c] for c in ORDER_COLUMNS)).where(
+        Order.id.in_(ids),
+        Order.status.in_(ARCHIVE_STATUSES),
+        Order.created_at < cutoff,
+    )
+    conn.execute(OrderArchive.__table__.insert().from_select(ORDER_COLUMNS, moved))
+
+    archived = select(OrderArchive.id).where(OrderArchive.id.in_(ids))
+    conn.execute(OrderItemArchive.__table__.insert().from_select(
+        ORDER_ITEM_COLUMNS,
+        select(*(OrderItem.__table__.c[c] for c in ORDER_ITEM_COLUMNS))
+        .where(OrderItem.order_id.in_(archived))
+        .order_by(OrderItem.id)
+    ))
+    conn.execute(OrderItem.__table__.delete().where(OrderItem.order_id.in_(archived)))
+    return conn.execute(Order.__table__.delete().where(Order.id.in_(archived))).rowcount
+
+
+def archive_orders(engine, cutoff, batch_size=1000, pause=0.05, limit=None, log=print):
+    """Move archivable orders created before `cutoff`, oldest first, in
+    batches of `batch_size`. Returns the number of orders moved."""
+    total = 0
+    with engine.connect() as conn:
+        while limit is None or total < limit:
+            size = batch_size if limit is None else min(batch_size, limit - total)
+            ids = conn.execute(
+                select(Order.id)
+                .where(
+                    Order.status.in_(ARCHIVE_STATUSES),
+                    Order.created_at < cutoff,
+                    # Never move the newest row: SQLite would hand its id out again
+                    Order.id < select(func.max(Order.id)).scalar_subquery(),
+                )
+                .order_by(Order.created_at, Order.id)
+                .limit(size)
+            ).scalars().all()
+            # End the read transaction so the batch starts with a write
+            conn.commit()
+            if not ids:
+                break
+
+            moved = _archive_batch(conn, ids, cutoff)
+            conn.commit()
+            total += moved
+            if log:
+                log(f"archived {total} orders")
+            if len(ids) < size:
+                break
+            time.sleep(pause)
+    return total
@@ -0,0 +1,172 @@
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built without it
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # optional: cards use the full-size images without it
+    Image = None
+
+
+# ------------------------------------------------------------
+# FINGERPRINTED STATIC ASSETS
+# ------------------------------------------------------------
+# `flask assets build` copies frontend/static into frontend/static/dist
+# under content-hashed names (css/dark.3f9c0a1b2c4d.css), writes .gz (and
+# .br with the `brotli` package) next to text files, renders smaller
+# thumbnails of the restaurant card images (with Pillow), and records
+# everything in dist/manifest.json.
+#
+# Templates call asset_url("css/dark.css"). With a manifest it points at
+# /assets/<hashed name>, served with a one-year immutable Cache-Control,
+# so browsers never revalidate it: a changed file gets a new name. Without
+# a build it falls back to the plain /static URL.
+#
+# A proxy in front of gunicorn can serve dist/ directly (e.g. nginx
+# gzip_static / brotli_static); the /assets route does the same
+# negotiation for setups without one.
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE = (".css", ".js", ".svg", ".json", ".txt", ".html")
+SKIPPED = (".DS_Store",)
+
+# Restaurant card pictures, cycled over the listing (see main.js)
+CARD_IMAGES = (
+    "img/rest1.jpg", "img/rest2.jpg", "img/rest3.jpg",
+    "img/rest4.jpg", "img/food4.jpg", "img/food5.jpg",
+)
+THUMB_SIZE = (640, 640)
+THUMB_QUALITY = 80
+
+
+def thumb_name(path):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.thumb{ext}"
+
+
+def _hashed_name(path, data):
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+
+
+def _thumbnail(data):
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail(THUMB_SIZE)
+    out = io.BytesIO()
+    image.convert("RGB").save(out, "JPEG", quality=THUMB_QUALITY, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+def _write(out_dir, name, data):
+    path = os.path.join(out_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _emit(out_dir, manifest, logical, data):
+    name = _hashed_name(logical, data)
+    _write(out_dir, name, data)
+    if logical.endswith(COMPRESSIBLE):
+        packed = gzip.compress(data, 9, mtime=0)
+        if len(packed) < len(data):
+            _write(out_dir, name + ".gz", packed)
+        if brotli is not None:
+            packed = brotli.compress(data, quality=11)
+            if len(packed) < len(data):
+                _write(out_dir, name + ".br", packed)
+    manifest[logical] = name
+
+
+def build_assets(static_dir, out_dir, clean=False, log=print):
+    """Fingerprint every file under `static_dir` into `out_dir` and write
+    the manifest. Returns the manifest."""
+    if clean:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        # Never fingerprint earlier build output
+        dirs[:] = [d for d in dirs if os.path.abspath(os.path.join(root, d)) != os.path.abspath(out_dir)]
+        for filename in sorted(files):
+            if filename in SKIPPED:
+                continue
+            logical = os.path.relpath(os.path.join(root, filename), static_dir).replace(os.sep, "/")
+            with open(os.path.join(root, filename), "rb") as f:
+                data = f.read()
+            _emit(out_dir, manifest, logical, data)
+            if logical in CARD_IMAGES and Image is not None:
+                _emit(out_dir, manifest, thumb_name(logical), _thumbnail(data))
+
+    if Image is None and log:
+        log("Pillow not installed: no card thumbnails")
+    if brotli is None and log:
+        log("brotli not installed: gzip variants only")
+
+    # Replace the manifest atomically; files of older builds stay servable
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = os.path.join(out_dir, "manifest.json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, os.path.join(out_dir, "manifest.json"))
+    if log:
+        log(f"Built {len(manifest)} assets into {out_dir}")
+    return manifest
+
+
+# ------------------------------------------------------------
+# RUNTIME
+# ------------------------------------------------------------
+def load_manifest(out_dir):
+    try:
+        with open(os.path.join(out_dir, "manifest.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def asset_url(path):
+    """URL of a static file: fingerprinted if built, plain /static otherwise."""
+    name = current_app.extensions["assets"].get(path)
+    if name is None:
+        return url_for("static", filename=path)
+    return url_for("assets", filename=name)
+
+
+def card_image_urls():
+    """Restaurant card images, as thumbnails when they were built."""
+    manifest = current_app.extensions["assets"]
+    return [asset_url(thumb_name(p) if thumb_name(p) in manifest else p) for p in CARD_IMAGES]
+
+
+def init_assets(app):
+    """Load the manifest and add the /assets route and template helpers."""
+    out_dir = app.config["ASSET_DIST"]
+    app.extensions["assets"] = load_manifest(out_dir)
+    app.jinja_env.globals.update(asset_url=asset_url, card_image_urls=card_image_urls)
+
+    @app.route("/assets/<path:filename>", endpoint="assets")
+    def assets(filename):
+        # Precompressed variant if the client takes it, else the file itself
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if encoding in request.accept_encodings and os.path.isfile(os.path.join(out_dir, filename + suffix)):
+                resp = send_from_directory(out_dir, filename + suffix, max_age=ASSET_MAX_AGE)
+                resp.headers["Content-Encoding"] = encoding
+                resp.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+                break
+        else:
+            resp = send_from_directory(out_dir, filename, max_age=ASSET_MAX_AGE)
+        resp.headers["Cache-Control"] = f"public, max-age={ASSET_MAX_AGE}, immutable"
+        resp.headers["Vary"] = "Accept-Encoding"
+        return resp
@@ -3,6 +3,8 @@ from functools import wraps
 from flask_login import current_user
 from flask import jsonify
 
+from backend.policy import allows_country
+
 def role_required(allowed_roles):
     def decorator(f):
         @wraps(f)
@@ -38,12 +40,9 @@ def enforce_country_scope(get_user_country_fn):
         def wrapped(*args, **kwargs):
             if not current_user.is_authenticated:
                 return jsonify({"error": "Authentication required"}), 401
-            # admin bypass
-            if current_user.role == "admin":
-                return f(*args, **kwargs)
-            # for manager/member, ensure country matches
+            # admin bypass; manager/member must match the country
             target_country = get_user_country_fn(*args, **kwargs)
-            if target_country and current_user.country != target_country:
+            if target_country and not allows_country(current_user, target_country):
                 return jsonify({"error": "Access limited to your country"}), 403
             return f(*args, **kwargs)
         return wrapped
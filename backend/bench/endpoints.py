@@ -0,0 +1,354 @@
+"""Endpoint benchmark suite.
+
+Drives every API route as each role (admin, manager, member) against
+generated datasets of increasing size, using the Flask test client from a
+pool of threads. Reports throughput, p50/p95/p99 latency and SQL
+statements per request, writes the results as JSON and fails (exit 1)
+when a per-endpoint query budget is exceeded or p95 latency regresses
+against a saved baseline:
+
+    python -m backend.bench.endpoints --sizes 1000,10000,100000 \
+        --threads 4 --requests 200 --out bench.json
+    python -m backend.bench.endpoints --baseline bench.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, select
+
+# Maximum SQL statements per request (BEGIN excluded), cold catalog cache
+# and cart creation included. They must not grow with the dataset; a
+# breach usually means an N+1 crept in.
+QUERY_BUDGETS = {
+    "restaurants": 4,
+    "restaurants_page": 4,
+    "cart": 3,
+    "cart_add": 14,
+    "cart_batch": 30,  # 5 ops over up to 5 restaurants
+    "checkout": 12,
+    "cancel": 10,
+    "payment_methods": 3,
+    "myorders": 5,
+    "myorders_delta": 5,
+    "myorders_all": 6,
+    "sales_report": 4,
+    "search": 2,
+}
+
+# Seeded demo users (backend/db_init.py), one per role
+ROLE_USERS = {
+    "admin": "nick",
+    "manager": "captain_marvel",
+    "member": "thanos",
+}
+
+# Endpoints each role is allowed to use
+ROLE_ENDPOINTS = {
+    "admin": [
+        "restaurants", "restaurants_page", "cart", "cart_add", "cart_batch", "checkout",
+        "cancel", "payment_methods", "myorders", "myorders_delta", "myorders_all",
+        "sales_report", "search",
+    ],
+    "manager": [
+        "restaurants", "restaurants_page", "cart", "cart_add", "cart_batch", "checkout",
+        "cancel", "payment_methods", "myorders", "myorders_delta", "sales_report",
+        "search",
+    ],
+    "member": [
+        "restaurants", "restaurants_page", "cart", "cart_add", "cart_batch",
+        "payment_methods", "myorders", "myorders_delta", "search",
+    ],
+}
+
+
+# ------------------------------------------------------------
+# SQL STATEMENT COUNTING (per thread, so per request)
+# ------------------------------------------------------------
+_local = threading.local()
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if not statement.startswith("BEGIN"):
+        _local.statements = getattr(_local, "statements", 0) + 1
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(p / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+# ------------------------------------------------------------
+# DATASET + APP
+# ------------------------------------------------------------
+def build_app(workdir, orders, seed):
+    """Fresh database with the demo users plus a generated dataset."""
+    path = os.path.join(workdir, f"bench-{orders}.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+
+    from backend.app import create_app
+    from backend.datagen import generate
+    from backend.db_init import seed_data
+    from backend.migrations import upgrade
+    from backend.models import db
+
+    app = create_app()
+    with app.app_context():
+        upgrade()
+        seed_data()
+        generate(
+            db.engine,
+            countries=2,
+            users=max(10, orders // 50),
+            restaurants=max(4, orders // 100),
+            menu_items=max(8, orders // 10),
+            orders=orders,
+            seed=seed,
+            log=None,
+        )
+        event.listen(db.engine, "before_cursor_execute", _count_statement)
+    return app
+
+
+def catalog_sample(app, country, limit=50):
+    """(restaurant_id, menu_item_id) pairs in `country` (None = any)."""
+    from backend.models import MenuItem, Restaurant, db
+
+    with app.app_context():
+        stmt = (
+            select(Restaurant.id, MenuItem.id)
+            .join(MenuItem, MenuItem.restaurant_id == Restaurant.id)
+            .order_by(Restaurant.id)
+            .limit(limit)
+        )
+        if country:
+            stmt = stmt.where(Restaurant.country == country)
+        return [tuple(row) for row in db.session.execute(stmt)]
+
+
+class RoleClient:
+    """A logged-in test client for one role, used by one thread."""
+
+    def __init__(self, app, role, pairs, rng):
+        self.client = app.test_client()
+        self.pairs = pairs
+        self.rng = rng
+        resp = self.client.post("/login", data={"username": ROLE_USERS[role], "password": "password"})
+        if resp.status_code != 302:
+            raise RuntimeError(f"login failed for {role}: {resp.status_code}")
+        self.payment_method_id = None
+        self.change_seq = "0"
+
+    def _pair(self):
+        return self.rng.choice(self.pairs)
+
+    def _payment_method(self):
+        if self.payment_method_id is None:
+            methods = self.client.get("/api/payment-methods").get_json()
+            if not methods:
+                methods = [self.client.post(
+                    "/api/payment-methods", json={"method_name": "Bench", "card_last4": "4242"}
+                ).get_json()]
+            self.payment_method_id = methods[0]["id"]
+        return self.payment_method_id
+
+    def _add(self):
+        rid, mid = self._pair()
+        return self.client.post("/api/cart/add", json={"restaurant_id": rid, "menu_item_id": mid})
+
+    # Each request() returns (setup, measured) callables; setup is untimed
+    def request(self, endpoint):
+        c = self.client
+        if endpoint == "restaurants":
+            return None, lambda: c.get("/api/restaurants")
+        if endpoint == "restaurants_page":
+            return None, lambda: c.get("/api/restaurants?limit=20&fields=id,name,country")
+        if endpoint == "cart":
+            return None, lambda: c.get("/api/cart")
+        if endpoint == "cart_add":
+            return None, self._add
+        if endpoint == "cart_batch":
+            def batch():
+                ops = [
+                    {"op": "add", "restaurant_id": rid, "menu_item_id": mid, "qty": 1}
+                    for rid, mid in (self._pair() for _ in range(5))
+                ]
+                return c.post("/api/cart/batch", json={"ops": ops})
+            return None, batch
+        if endpoint == "checkout":
+            state = {}
+
+            def setup():
+                state["order_id"] = self._add().get_json()["order_id"]
+                self._payment_method()
+            return setup, lambda: c.post("/api/checkout", json={
+                "order_id": state["order_id"], "payment_method_id": self.payment_method_id
+            })
+        if endpoint == "cancel":
+            state = {}
+
+            def setup():
+                state["order_id"] = self._add().get_json()["order_id"]
+            return setup, lambda: c.post(f"/api/order/{state['order_id']}/cancel")
+        if endpoint == "payment_methods":
+            return None, lambda: c.get("/api/payment-methods")
+        if endpoint == "myorders":
+            def listing():
+                resp = c.get("/api/myorders")
+                self.change_seq = resp.headers.get("X-Change-Seq", self.change_seq)
+                return resp
+            return None, listing
+        if endpoint == "myorders_delta":
+            return None, lambda: c.get(f"/api/myorders?since={self.change_seq}")
+        if endpoint == "myorders_all":
+            return None, lambda: c.get("/api/myorders?all=1&limit=500")
+        if endpoint == "sales_report":
+            return None, lambda: c.get("/api/reports/sales?group=day,status")
+        if endpoint == "search":
+            return None, lambda: c.get("/api/search?q=chick&limit=20")
+        raise ValueError(endpoint)
+
+
+# ------------------------------------------------------------
+# DRIVER
+# ------------------------------------------------------------
+def run_endpoint(clients, endpoint, requests):
+    """Issue `requests` calls spread over one client per thread."""
+    latencies, statements, errors = [], [], 0
+    lock = threading.Lock()
+    per_thread = [requests // len(clients) + (i < requests % len(clients)) for i in range(len(clients))]
+
+    def worker(client, n):
+        nonlocal errors
+        for _ in range(n):
+            setup, call = client.request(endpoint)
+            if setup:
+                setup()
+            _local.statements = 0
+            start = time.perf_counter()
+            resp = call()
+            resp.get_data()  # drain streamed bodies inside the timing
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statements.append(_local.statements)
+                if resp.status_code >= 400:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        list(pool.map(worker, clients, per_thread))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "sql_mean": round(sum(statements) / len(statements), 2) if statements else 0.0,
+        "sql_max": max(statements) if statements else 0,
+    }
+
+
+def run(sizes, threads, requests, seed, log=print):
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            log(f"== dataset: {size} orders")
+            app = build_app(workdir, size, seed)
+            results[str(size)] = {}
+            for role, endpoints in ROLE_ENDPOINTS.items():
+                country = None if role == "admin" else "India"
+                pairs = catalog_sample(app, country)
+                clients = [
+                    RoleClient(app, role, pairs, random.Random(seed + i))
+                    for i in range(threads)
+                ]
+                results[str(size)][role] = {}
+                for endpoint in endpoints:
+                    stats = run_endpoint(clients, endpoint, requests)
+                    results[str(size)][role][endpoint] = stats
+                    log(
+                        f"  {role:<8} {endpoint:<17} {stats['rps']:>8.1f} req/s"
+                        f"  p50 {stats['p50_ms']:>8.2f}  p95 {stats['p95_ms']:>8.2f}"
+                        f"  p99 {stats['p99_ms']:>8.2f} ms  sql {stats['sql_mean']:>5.1f}"
+                        f" (max {stats['sql_max']})  errors {stats['errors']}"
+                    )
+            from backend.models import db
+            with app.app_context():
+                db.engine.dispose()
+    return results
+
+
+def check(results, baseline=None, regression=0.25, noise_ms=2.0):
+    """List of human-readable failures (empty when everything passes)."""
+    failures = []
+    for size, roles in results.items():
+        for role, endpoints in roles.items():
+            for endpoint, stats in endpoints.items():
+                budget = QUERY_BUDGETS.get(endpoint)
+                if budget is not None and stats["sql_max"] > budget:
+                    failures.append(
+                        f"{size}/{role}/{endpoint}: {stats['sql_max']} SQL statements > budget {budget}"
+                    )
+                if stats["errors"]:
+                    failures.append(f"{size}/{role}/{endpoint}: {stats['errors']} error responses")
+
+                base = (baseline or {}).get(size, {}).get(role, {}).get(endpoint)
+                if base:
+                    limit = base["p95_ms"] * (1 + regression)
+                    if stats["p95_ms"] > limit and stats["p95_ms"] - base["p95_ms"] > noise_ms:
+                        failures.append(
+                            f"{size}/{role}/{endpoint}: p95 {stats['p95_ms']:.2f} ms vs baseline "
+                            f"{base['p95_ms']:.2f} ms (+{regression:.0%} allowed)"
+                        )
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Endpoint benchmark suite.")
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma-separated order counts")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint and role")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare p95 latency against")
+    parser.add_argument("--regression", type=float, default=0.25, help="allowed p95 slowdown (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    results = run(sizes, args.threads, args.requests, args.seed)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({
+                "meta": {"threads": args.threads, "requests": args.requests, "seed": args.seed},
+                "results": results,
+            }, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+
+    failures = check(results, baseline, args.regression)
+    for failure in failures:
+        print("FAIL", failure)
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
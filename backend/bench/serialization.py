@@ -0,0 +1,162 @@
+"""Order serialization micro-benchmark.
+
+Compares the old per-route path (hand-built dicts with isoformat() per
+order, passed to Flask's stock jsonify) with backend/serializers.py
+(model encoders + FastJSONProvider, with orjson and with the stdlib
+fallback) on an in-memory list of orders, plus the cost of gzipping the
+body:
+
+    python -m backend.bench.serialization --orders 10000 --runs 10
+"""
+import argparse
+import gzip
+import json
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend import serializers
+from backend.models import MenuItem, Order, OrderItem, Restaurant
+from backend.serializers import FastJSONProvider, order_json
+
+
+def make_orders(count, items_per_order, seed=42):
+    """Transient Order graphs shaped like ORDER_GRAPH loads them."""
+    rng = random.Random(seed)
+    restaurants = [Restaurant(id=i, name=f"Restaurant {i}", country=rng.choice(("India", "America")))
+                   for i in range(1, 51)]
+    menu = [MenuItem(id=i, restaurant_id=rng.choice(restaurants).id, name=f"Dish {i}",
+                     price=round(rng.uniform(2, 40), 2))
+            for i in range(1, 501)]
+    start = datetime(2024, 1, 1)
+
+    orders = []
+    for oid in range(1, count + 1):
+        restaurant = rng.choice(restaurants)
+        lines = [
+            OrderItem(id=oid * 100 + n, order_id=oid, menu_item_id=m.id, menu_item=m,
+                      qty=rng.randint(1, 4), unit_price=m.price)
+            for n, m in enumerate(rng.sample(menu, items_per_order))
+        ]
+        orders.append(Order(
+            id=oid, user_id=rng.randint(1, 100), restaurant_id=restaurant.id, restaurant=restaurant,
+            status=rng.choice(("cart", "placed", "cancelled")),
+            total=round(sum(i.qty * i.unit_price for i in lines), 2),
+            created_at=start + timedelta(seconds=rng.randint(0, 300 * 24 * 3600), microseconds=rng.randint(0, 999999)),
+            country=restaurant.country, added_by=f"user{oid % 100}", cancelled_by=None,
+            change_seq=oid, items=lines,
+        ))
+    return orders
+
+
+def legacy_order_json(o):
+    """The per-route serializer backend/app.py used before serializers.py."""
+    return {
+        "id": o.id,
+        "restaurant": o.restaurant.name if o.restaurant else None,
+        "restaurant_id": o.restaurant_id,
+        "country": o.country,
+        "status": o.status,
+        "total": o.total,
+        "items": [
+            {
+                "menu_item_id": i.menu_item_id,
+                "name": i.menu_item.name,
+                "qty": i.qty,
+                "price": i.unit_price
+            }
+            for i in o.items
+        ],
+        "added_by": o.added_by,
+        "cancelled_by": o.cancelled_by,
+        "created_at": o.created_at.isoformat(),
+        "seq": o.change_seq
+    }
+
+
+@contextmanager
+def stdlib_backend():
+    saved, serializers.orjson = serializers.orjson, None
+    try:
+        yield
+    finally:
+        serializers.orjson = saved
+
+
+def time_path(app, provider, encode, orders, runs):
+    """Median seconds to build the dicts and the response body."""
+    app.json = provider
+    build, dump, body = [], [], b""
+    with app.app_context():
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            rows = [encode(o) for o in orders]
+            t1 = time.perf_counter()
+            body = provider.response(rows).get_data()
+            t2 = time.perf_counter()
+            build.append(t1 - t0)
+            dump.append(t2 - t1)
+    return {
+        "build_ms": statistics.median(build) * 1000,
+        "dump_ms": statistics.median(dump) * 1000,
+        "total_ms": (statistics.median(build) + statistics.median(dump)) * 1000,
+        "bytes": len(body),
+    }, body
+
+
+def time_gzip(body, level, runs):
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        packed = gzip.compress(body, level, mtime=0)
+        times.append(time.perf_counter() - t0)
+    return {"total_ms": statistics.median(times) * 1000, "bytes": len(packed)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--items", type=int, default=3, help="lines per order")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    orders = make_orders(args.orders, args.items)
+    app = Flask(__name__)
+
+    results = {}
+    results["jsonify (before)"], _ = time_path(app, DefaultJSONProvider(app), legacy_order_json, orders, args.runs)
+    with stdlib_backend():
+        results["encoders + json"], _ = time_path(app, FastJSONProvider(app), order_json, orders, args.runs)
+    if serializers.orjson is not None:
+        results["encoders + orjson"], body = time_path(app, FastJSONProvider(app), order_json, orders, args.runs)
+    else:
+        body = None
+    if body is None:
+        with stdlib_backend():
+            _, body = time_path(app, FastJSONProvider(app), order_json, orders, 1)
+    results[f"gzip -{args.gzip_level}"] = time_gzip(body, args.gzip_level, args.runs)
+
+    if args.json:
+        print(json.dumps({"orders": args.orders, "items": args.items, "results": results}, indent=2))
+        return
+
+    baseline = results["jsonify (before)"]["total_ms"]
+    print(f"{args.orders} orders x {args.items} items, median of {args.runs} runs")
+    for name, r in results.items():
+        parts = [f"{name:<18} {r['total_ms']:8.1f} ms"]
+        if "build_ms" in r:
+            parts.append(f"(dicts {r['build_ms']:6.1f} + json {r['dump_ms']:6.1f})")
+            parts.append(f"x{baseline / r['total_ms']:4.1f}")
+        parts.append(f"{r['bytes'] / 1024:8.0f} KiB")
+        print("   ".join(parts))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Worker cold-start benchmark.
+
+Measures, in fresh interpreters, how long a gunicorn worker spends
+importing the app module and running the app factory:
+
+    python -m backend.bench.startup --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import backend.app
+t1 = time.perf_counter()
+app = backend.app.create_app()
+t2 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "create_app": t2 - t1}))
+"""
+
+
+def run_once():
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {
+        phase: {
+            "median_ms": statistics.median(r[phase] for r in runs) * 1000,
+            "max_ms": max(r[phase] for r in runs) * 1000,
+        }
+        for phase in ("import", "create_app")
+    }
+
+    if args.json:
+        print(json.dumps({"runs": runs, "summary": summary}, indent=2))
+        return
+
+    for phase, stats in summary.items():
+        print(f"{phase:<11} median {stats['median_ms']:8.1f} ms   max {stats['max_ms']:8.1f} ms")
+    total = summary["import"]["median_ms"] + summary["create_app"]["median_ms"]
+    print(f"{'total':<11} median {total:8.1f} ms   ({args.runs} runs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+from sqlalchemy import func, select
+from sqlalchemy.dialects.sqlite import insert
+
+from backend.catalog import cached_restaurant
+from backend.models import db, Order, OrderItem
+from backend.policy import allows_country
+from backend.sharding import ShardError, route_to, shard_for_id, shard_id_values
+
+
+# ------------------------------------------------------------
+# INCREMENTAL CART ENGINE
+# ------------------------------------------------------------
+# Cart mutations touch only the affected line and the order row:
+# order.total is adjusted by the line delta instead of being re-summed
+# over every item. Line mutations return their total delta, and callers
+# apply it with adjust_total() once per cart, then commit once.
+
+class CartError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def parse_line(menu_item_id, qty):
+    """(menu_item_id, qty) from request values, as ints."""
+    try:
+        menu_item_id = int(menu_item_id)
+    except (TypeError, ValueError):
+        raise CartError("Invalid item")
+    try:
+        qty = int(qty)
+    except (TypeError, ValueError):
+        raise CartError("Invalid qty")
+    return menu_item_id, qty
+
+
+def resolve_restaurant(user, restaurant_id):
+    """Cached catalog entry for `restaurant_id`, checked against the user's
+    country scope. Routes the request to the restaurant's shard."""
+    try:
+        restaurant_id = int(restaurant_id)
+    except (TypeError, ValueError):
+        raise CartError("Missing fields")
+
+    # Restaurants outside the user's scope do not exist for them
+    restaurant = cached_restaurant(restaurant_id)
+    if not restaurant or not allows_country(user, restaurant["country"]):
+        raise CartError("Restaurant not found", 404)
+
+    try:
+        route_to(shard_for_id(restaurant["id"]))
+    except ShardError:
+        raise CartError("Cart changes must stay within one country")
+
+    return restaurant
+
+
+def find_cart(user, restaurant_id):
+    return Order.query.filter_by(
+        user_id=user.id,
+        status="cart",
+        restaurant_id=restaurant_id
+    ).first()
+
+
+def open_cart(user, restaurant):
+    """Return the user's cart for `restaurant` (a cached catalog entry),
+    creating it in the current transaction if needed."""
+    cart = find_cart(user, restaurant["id"])
+
+    if not cart:
+        cart = Order(
+            user_id=user.id,
+            restaurant_id=restaurant["id"],
+            status="cart",
+            total=0.0,
+            country=restaurant["country"],
+            added_by=user.username
+        )
+        db.session.add(cart)
+        db.session.flush()
+
+    return cart
+
+
+def adjust_total(cart, delta):
+    if delta:
+        cart.total = func.round(func.coalesce(Order.total, 0) + delta, 2)
+
+
+def _find_line(cart, menu_item_id):
+    return db.session.execute(
+        select(OrderItem.id, OrderItem.qty, OrderItem.unit_price).where(
+            OrderItem.order_id == cart.id,
+            OrderItem.menu_item_id == menu_item_id
+        )
+    ).first()
+
+
+def add_item(cart, restaurant, menu_item_id, qty):
+    """Add `qty` of a menu item to `cart`, merging with an existing line."""
+    if qty < 1:
+        raise CartError("Invalid qty")
+
+    price = restaurant["items"].get(menu_item_id)
+    if price is None:
+        raise CartError("Invalid item")
+
+    line = _find_line(cart, menu_item_id)
+    if line:
+        db.session.execute(
+            OrderItem.__table__.update()
+            .where(OrderItem.id == line.id)
+            .values(qty=OrderItem.qty + qty)
+        )
+        delta = line.unit_price * qty
+    else:
+        # Upsert so a concurrent add of the same item merges instead of failing
+        stmt = insert(OrderItem).values(
+            order_id=cart.id, menu_item_id=menu_item_id, qty=qty, unit_price=price,
+            **shard_id_values(OrderItem.__table__, db.session.connection())
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OrderItem.order_id, OrderItem.menu_item_id],
+            set_={"qty": OrderItem.qty + qty}
+        )
+        db.session.execute(stmt)
+        delta = price * qty
+
+    return delta
+
+
+def remove_item(cart, menu_item_id):
+    """Drop a line from `cart`. Removing an absent item is a no-op."""
+    line = _find_line(cart, menu_item_id)
+    if not line:
+        return 0.0
+
+    db.session.execute(
+        OrderItem.__table__.delete().where(OrderItem.id == line.id)
+    )
+    return -line.unit_price * (line.qty or 0)
+
+
+def set_qty(cart, restaurant, menu_item_id, qty):
+    """Set the quantity of a line; 0 removes it."""
+    if qty < 0:
+        raise CartError("Invalid qty")
+    if qty == 0:
+        return remove_item(cart, menu_item_id)
+
+    line = _find_line(cart, menu_item_id)
+    if not line:
+        return add_item(cart, restaurant, menu_item_id, qty)
+
+    db.session.execute(
+        OrderItem.__table__.update()
+        .where(OrderItem.id == line.id)
+        .values(qty=qty)
+    )
+    return line.unit_price * (qty - (line.qty or 0))
+
+
+MAX_BATCH_OPS = 100
+
+
+def apply_ops(user, ops):
+    """Apply a list of cart operations in the current transaction.
+
+    Each op is {"op": "add" | "remove" | "set", "restaurant_id",
+    "menu_item_id", "qty"}. Restaurants are resolved and country-checked
+    once per batch. Returns the ids of the carts that were touched.
+    """
+    if not isinstance(ops, list) or not ops:
+        raise CartError("Missing ops")
+    if len(ops) > MAX_BATCH_OPS:
+        raise CartError(f"Too many ops (max {MAX_BATCH_OPS})")
+
+    restaurants = {}
+    carts = {}
+    deltas = {}
+
+    for index, op in enumerate(ops):
+        try:
+            kind = op.get("op", "add")
+            restaurant_id = int(op["restaurant_id"])
+            menu_item_id = int(op["menu_item_id"])
+            qty = int(op.get("qty", 1))
+        except (AttributeError, KeyError, TypeError, ValueError):
+            raise CartError(f"ops[{index}]: missing fields")
+
+        try:
+            if restaurant_id not in restaurants:
+                restaurants[restaurant_id] = resolve_restaurant(user, restaurant_id)
+            restaurant = restaurants[restaurant_id]
+
+            cart = carts.get(restaurant_id)
+            if cart is None:
+                if kind == "remove":
+                    # Nothing to remove from a cart that does not exist
+                    cart = find_cart(user, restaurant_id)
+                    if cart is None:
+                        continue
+                else:
+                    cart = open_cart(user, restaurant)
+                carts[restaurant_id] = cart
+
+            if kind == "add":
+                delta = add_item(cart, restaurant, menu_item_id, qty)
+            elif kind == "remove":
+                delta = remove_item(cart, menu_item_id)
+            elif kind == "set":
+                delta = set_qty(cart, restaurant, menu_item_id, qty)
+            else:
+                raise CartError("Unknown op")
+        except CartError as e:
+            raise CartError(f"ops[{index}]: {e.message}", e.status)
+
+        deltas[restaurant_id] = deltas.get(restaurant_id, 0.0) + delta
+
+    # One total update per cart, not per op
+    cart_ids = []
+    for restaurant_id, cart in carts.items():
+        cart_ids.append(cart.id)
+        adjust_total(cart, deltas.get(restaurant_id, 0.0))
+    return cart_ids
+
+
+def order_total(order_id):
+    """Sum of the order's lines from their price snapshots."""
+    total = db.session.execute(
+        select(func.sum(OrderItem.unit_price * OrderItem.qty))
+        .where(OrderItem.order_id == order_id)
+    ).scalar()
+    return round(total or 0.0, 2)
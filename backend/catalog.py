@@ -0,0 +1,189 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import selectinload
+
+from backend.models import db, CatalogVersion, MenuItem, Restaurant
+from backend.sharding import current_shard, shard_for_id, sharding_enabled, use_shard
+
+
+# ------------------------------------------------------------
+# VERSIONED CATALOG CACHE
+# ------------------------------------------------------------
+# Restaurants and menus are read on every page load but change rarely.
+# Rendered listings and per-restaurant lookups are cached in-process and
+# tagged with the catalog version they were built from. The version lives
+# in the database (catalog_version), so a change committed by any gunicorn
+# worker invalidates the entries held by all of them.
+#
+# The cache is bounded by entry count and by bytes: a full country listing
+# can be several MB. Entries larger than the whole budget are not cached.
+
+# Rough in-memory size of a cached restaurant lookup (dict + menu entries)
+RESTAURANT_ENTRY_BYTES = 512
+MENU_ENTRY_BYTES = 100
+
+
+class CatalogCache:
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value, size):
+        """Cache `value`, which takes about `size` bytes."""
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (version, value, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def init_catalog_cache(app):
+    app.extensions["catalog_cache"] = CatalogCache(
+        max_entries=app.config.get("CATALOG_CACHE_SIZE", 256),
+        max_bytes=app.config.get("CATALOG_CACHE_BYTES", 64 * 1024 * 1024),
+    )
+
+
+def catalog_cache():
+    return current_app.extensions["catalog_cache"]
+
+
+# ------------------------------------------------------------
+# VERSION STAMP
+# ------------------------------------------------------------
+def catalog_version():
+    """Current catalog version (of the current shard), read at most once
+    per request."""
+    versions = g.setdefault("catalog_versions", {})
+    shard = current_shard()
+    if shard not in versions:
+        versions[shard] = db.session.execute(
+            select(CatalogVersion.version).where(CatalogVersion.id == 1)
+        ).scalar() or 0
+    return versions[shard]
+
+
+def catalog_versions(shards):
+    """Version of a listing read from `shards`: the plain version for one
+    shard, the shard versions joined with "." for several."""
+    versions = []
+    for shard in shards:
+        with use_shard(shard):
+            versions.append(catalog_version())
+    return versions[0] if len(versions) == 1 else ".".join(map(str, versions))
+
+
+def bump_catalog_version(conn):
+    stmt = insert(CatalogVersion).values(id=1, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CatalogVersion.id],
+        set_={"version": CatalogVersion.version + 1}
+    )
+    conn.execute(stmt)
+
+
+@event.listens_for(db.session, "after_flush")
+def _bump_on_catalog_change(session, flush_context):
+    changed = any(
+        isinstance(obj, (Restaurant, MenuItem))
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+    )
+    if changed:
+        bump_catalog_version(session.connection())
+        if has_app_context():
+            g.pop("catalog_versions", None)
+
+
+def etag_for(key, version):
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:16]
+    return f"{version}-{digest}"
+
+
+# ------------------------------------------------------------
+# CACHED LOOKUPS
+# ------------------------------------------------------------
+def cached_restaurant(restaurant_id):
+    """Restaurant with its menu as plain data, or None if it does not exist.
+
+    Returns {"id", "name", "country", "items": {menu_item_id: price}}.
+    """
+    shard = shard_for_id(restaurant_id)
+    if shard is None and sharding_enabled():
+        return None
+    with use_shard(shard):
+        return _cached_restaurant(restaurant_id)
+
+
+def _cached_restaurant(restaurant_id):
+    key = ("restaurant", restaurant_id)
+    version = catalog_version()
+    cache = catalog_cache()
+
+    entry = cache.get(key, version)
+    if entry is not None:
+        return entry or None
+
+    # Shared by every user: read unscoped, callers apply allows_country()
+    r = (
+        Restaurant.query
+        .execution_options(policy_scope=False)
+        .options(selectinload(Restaurant.menu_items))
+        .filter(Restaurant.id == restaurant_id)
+        .first()
+    )
+    entry = {}
+    if r:
+        entry = {
+            "id": r.id,
+            "name": r.name,
+            "country": r.country,
+            "items": {m.id: m.price for m in r.menu_items},
+        }
+    # Misses are cached too so bogus ids do not hit the database
+    cache.put(key, version, entry, RESTAURANT_ENTRY_BYTES + MENU_ENTRY_BYTES * len(entry.get("items", ())))
+    return entry or None
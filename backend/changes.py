@@ -0,0 +1,78 @@
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert
+
+from backend.models import db, ChangeSequence, Order
+from backend.pagination import PaginationError
+from backend.sharding import use_shard
+
+
+# ------------------------------------------------------------
+# ORDER CHANGE FEED
+# ------------------------------------------------------------
+# Every inserted or updated Order gets the next value of a database-wide
+# sequence in Order.change_seq. Clients keep a local copy of their orders
+# and ask for rows with change_seq > the last value they saw, either with
+# GET /api/myorders?since=<seq> or through the SSE stream. The database is
+# the only coordination point, so this works across gunicorn workers.
+#
+# With country sharding every shard has its own sequence. A position that
+# spans several shards (admin listings) is their values joined with ".",
+# in shard order; clients treat it as an opaque string.
+
+CHANGE_SEQ_HEADER = "X-Change-Seq"
+
+
+def next_change_seq(conn, count=1):
+    """Reserve `count` sequence numbers and return the highest one."""
+    stmt = insert(ChangeSequence).values(id=1, value=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ChangeSequence.id],
+        set_={"value": ChangeSequence.value + count}
+    )
+    conn.execute(stmt)
+    return conn.execute(
+        select(ChangeSequence.value).where(ChangeSequence.id == 1)
+    ).scalar()
+
+
+def current_change_seq():
+    return db.session.execute(
+        select(ChangeSequence.value).where(ChangeSequence.id == 1)
+    ).scalar() or 0
+
+
+def current_positions(shards):
+    positions = []
+    for shard in shards:
+        with use_shard(shard):
+            positions.append(current_change_seq())
+    return positions
+
+
+def format_positions(positions):
+    return ".".join(str(p) for p in positions)
+
+
+def parse_positions(raw, count):
+    """Per-shard positions from "12" or "12.7", or None if `raw` is not a
+    change position at all (e.g. an ISO date)."""
+    parts = raw.split(".")
+    if not raw or not all(p.isdigit() for p in parts):
+        return None
+    if len(parts) != count:
+        raise PaginationError("Invalid change position")
+    return [int(p) for p in parts]
+
+
+@event.listens_for(db.session, "before_flush")
+def _stamp_order_changes(session, flush_context, instances):
+    changed = [
+        obj for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Order) and (obj in session.new or session.is_modified(obj))
+    ]
+    if not changed:
+        return
+
+    last = next_change_seq(session.connection(), len(changed))
+    for offset, order in enumerate(changed):
+        order.change_seq = last - len(changed) + 1 + offset
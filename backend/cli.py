@@ -0,0 +1,137 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from backend.archive import archive_cutoff, archive_orders
+from backend.assets import build_assets
+from backend.datagen import DatagenError, generate
+from backend.db_init import seed_data
+from backend.migrations import latest_version, upgrade
+from backend.models import db
+from backend.reports import rebuild_sales_rollups
+from backend.search import rebuild_search_index
+from backend.sharding import shard_engine, shard_names, sharding_enabled
+
+
+# ------------------------------------------------------------
+# flask db ...
+# ------------------------------------------------------------
+# Schema creation and seeding are provisioning steps, run once per deploy
+# rather than by every gunicorn worker inside create_app():
+#
+#   flask --app "backend.app:create_app" db init      # upgrade + seed
+#   flask --app "backend.app:create_app" db upgrade
+#   flask --app "backend.app:create_app" db seed
+#   flask --app "backend.app:create_app" db generate --orders 1000000
+#   flask --app "backend.app:create_app" db rebuild-rollups
+#   flask --app "backend.app:create_app" db archive-orders
+#   flask --app "backend.app:create_app" db rebuild-search
+
+db_cli = AppGroup("db", help="Database provisioning commands.")
+
+
+def _upgrade():
+    applied = upgrade()
+    for version, description in applied:
+        click.echo(f"  applied {version}: {description}")
+    click.echo(f"Schema at version {latest_version()}.")
+
+
+@db_cli.command("upgrade")
+def upgrade_command():
+    """Create missing tables and apply pending migrations."""
+    _upgrade()
+
+
+@db_cli.command("seed")
+def seed_command():
+    """Insert the demo users, restaurants and menus if the database is empty."""
+    seed_data()
+
+
+@db_cli.command("init")
+def init_command():
+    """Upgrade the schema, then seed demo data."""
+    _upgrade()
+    seed_data()
+
+
+@db_cli.command("generate")
+@click.option("--countries", default=2, show_default=True)
+@click.option("--users", default=100, show_default=True)
+@click.option("--restaurants", default=200, show_default=True)
+@click.option("--menu-items", default=2000, show_default=True)
+@click.option("--orders", default=10000, show_default=True)
+@click.option("--days", default=365, show_default=True, help="Spread of order dates.")
+@click.option("--seed", default=0, show_default=True, help="Random seed (same seed, same data).")
+def generate_command(countries, users, restaurants, menu_items, orders, days, seed):
+    """Append a synthetic load-testing dataset (see backend/datagen.py)."""
+    if sharding_enabled():
+        raise click.ClickException("generate writes a single database; unset SHARD_COUNTRIES")
+    _upgrade()
+    try:
+        counts = generate(
+            db.engine, countries=countries, users=users, restaurants=restaurants,
+            menu_items=menu_items, orders=orders, days=days, seed=seed, log=click.echo
+        )
+    except DatagenError as e:
+        raise click.ClickException(str(e))
+    click.echo(", ".join(f"{n} {table}" for table, n in counts.items()))
+
+
+@db_cli.command("rebuild-rollups")
+def rebuild_rollups_command():
+    """Recompute the sales rollups from the orders."""
+    buckets = 0
+    for shard in shard_names():
+        with shard_engine(shard).connect() as conn:
+            buckets += rebuild_sales_rollups(conn)
+            conn.commit()
+    click.echo(f"Rebuilt {buckets} sales rollup buckets.")
+
+
+@db_cli.command("rebuild-search")
+def rebuild_search_command():
+    """Refill the menu search index from the catalog."""
+    rows = 0
+    for shard in shard_names():
+        with shard_engine(shard).connect() as conn:
+            rows += rebuild_search_index(conn)
+            conn.commit()
+    click.echo(f"Indexed {rows} menu items.")
+
+
+@db_cli.command("archive-orders")
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option("--pause", default=0.05, show_default=True, help="Seconds between batches.")
+@click.option("--limit", type=int, default=None, help="Stop after this many orders.")
+def archive_orders_command(batch_size, pause, limit):
+    """Move placed/cancelled orders older than ORDER_ARCHIVE_DAYS to the archive."""
+    cutoff = archive_cutoff()
+    click.echo(f"Archiving orders created before {cutoff.isoformat()}")
+    moved = 0
+    for shard in shard_names():
+        if shard is not None:
+            click.echo(f"Shard {shard}:")
+        remaining = None if limit is None else limit - moved
+        moved += archive_orders(
+            shard_engine(shard), cutoff, batch_size=batch_size, pause=pause, limit=remaining, log=click.echo
+        )
+    click.echo(f"Moved {moved} orders.")
+
+
+# ------------------------------------------------------------
+# flask assets ...
+# ------------------------------------------------------------
+#   flask --app "backend.app:create_app" assets build    # per deploy
+
+assets_cli = AppGroup("assets", help="Static asset commands.")
+
+
+@assets_cli.command("build")
+@click.option("--clean", is_flag=True, help="Remove earlier builds first.")
+def assets_build_command(clean):
+    """Fingerprint and precompress frontend/static into ASSET_DIST."""
+    build_assets(
+        current_app.static_folder, current_app.config["ASSET_DIST"], clean=clean, log=click.echo
+    )
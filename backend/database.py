@@ -0,0 +1,140 @@
+import os
+import random
+import time
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+from backend.models import db
+from backend.sharding import current_shard, shard_engine
+
+
+# ------------------------------------------------------------
+# DATABASE CONFIGURATION
+# ------------------------------------------------------------
+# Everything is read from the environment so gunicorn workers, the CLI
+# and local runs share one configuration:
+#
+#   DATABASE_URL            default sqlite:///foodapp.db (instance folder)
+#   SQLITE_BUSY_TIMEOUT_MS  wait for a lock instead of failing (5000)
+#   SQLITE_MMAP_SIZE        bytes of the file to memory-map (256 MiB)
+#   SQLITE_CACHE_SIZE       page cache; negative means KiB (-65536 = 64 MiB)
+#   GUNICORN_THREADS        threads per worker (see gunicorn.conf.py)
+#   DB_POOL_SIZE / DB_MAX_OVERFLOW   override the derived pool size
+#   DB_LOCK_RETRIES         retries for write routes hitting a lock (5)
+
+DEFAULT_DATABASE_URL = "sqlite:///foodapp.db"
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def configure_database(app):
+    """Set the database URL and engine options. Call before db.init_app."""
+    app.config.setdefault("SQLALCHEMY_DATABASE_URI", os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL))
+    app.config.setdefault("SQLITE_BUSY_TIMEOUT_MS", _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    app.config.setdefault("SQLITE_MMAP_SIZE", _env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    app.config.setdefault("SQLITE_CACHE_SIZE", _env_int("SQLITE_CACHE_SIZE", -65536))
+    app.config.setdefault("DB_LOCK_RETRIES", _env_int("DB_LOCK_RETRIES", 5))
+
+    # One connection per request thread, plus headroom for streamed
+    # responses. Sync workers serve one request at a time.
+    threads = _env_int("GUNICORN_THREADS", 1)
+    options = app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", {})
+    if not app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite:///:memory:"):
+        options.setdefault("pool_size", _env_int("DB_POOL_SIZE", max(threads, 1)))
+        options.setdefault("max_overflow", _env_int("DB_MAX_OVERFLOW", max(threads, 2)))
+    options.setdefault("connect_args", {}).setdefault(
+        "timeout", app.config["SQLITE_BUSY_TIMEOUT_MS"] / 1000.0
+    )
+
+
+def install_sqlite_tuning(app):
+    """Apply per-connection pragmas to every SQLite engine. Call after
+    db.init_app."""
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite" and not getattr(engine, "_foodapp_tuned", False):
+                _tune_engine(engine, app.config)
+                engine._foodapp_tuned = True
+
+
+def _tune_engine(engine, config):
+    pragmas = (
+        ("journal_mode", "WAL"),
+        ("synchronous", "NORMAL"),
+        ("busy_timeout", int(config["SQLITE_BUSY_TIMEOUT_MS"])),
+        ("mmap_size", int(config["SQLITE_MMAP_SIZE"])),
+        ("cache_size", int(config["SQLITE_CACHE_SIZE"])),
+        ("temp_store", "MEMORY"),
+    )
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        # SQLAlchemy emits BEGIN itself (see _on_begin), so pysqlite must
+        # not open transactions implicitly
+        dbapi_conn.isolation_level = None
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas:
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        # Write routes take the write lock up front. A deferred transaction
+        # that reads first and upgrades later can fail with SQLITE_BUSY at
+        # once, without waiting on busy_timeout. With sharding, only the
+        # routed shard is locked, not the global database it also reads.
+        if has_app_context() and g.get("db_write") and _locks_for_writes(engine):
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        else:
+            conn.exec_driver_sql("BEGIN")
+
+
+def _locks_for_writes(engine):
+    shard = current_shard()
+    return shard is None or shard_engine(shard) is engine
+
+
+# ------------------------------------------------------------
+# WRITE ROUTES
+# ------------------------------------------------------------
+def is_lock_error(exc):
+    message = str(getattr(exc, "orig", exc)).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def write_transaction(f):
+    """Run unsafe (non-GET) requests to a view in a BEGIN IMMEDIATE
+    transaction and retry them, with jittered exponential backoff, if
+    SQLite still reports a lock."""
+    @wraps(f)
+    def wrapped(*args, **kwargs):
+        if request.method in ("GET", "HEAD", "OPTIONS"):
+            return f(*args, **kwargs)
+
+        retries = current_app.config.get("DB_LOCK_RETRIES", 5)
+        attempt = 0
+        while True:
+            # Cleared by the view's commit (_end_write): reads after it,
+            # like reloading the result, do not take the write lock again
+            g.db_write = True
+            try:
+                return f(*args, **kwargs)
+            except OperationalError as e:
+                db.session.rollback()
+                committed = not g.get("db_write")
+                if committed or not is_lock_error(e) or attempt >= retries:
+                    raise
+                time.sleep(min(0.05 * 2 ** attempt, 1.0) * (0.5 + random.random()))
+                attempt += 1
+    return wrapped
+
+
+@event.listens_for(db.session, "after_commit")
+def _end_write(session):
+    if has_app_context():
+        g.pop("db_write", None)
@@ -0,0 +1,249 @@
+"""Synthetic dataset generator for load testing.
+
+Fills a database with a configurable, deterministic (seeded) catalog and
+order history using bulk Core inserts in large transactions:
+
+    flask --app "backend.app:create_app" db generate \
+        --countries 50 --users 20000 --restaurants 100000 \
+        --menu-items 5000000 --orders 20000000 --seed 42
+
+or from Python:
+
+    from backend.datagen import generate
+    generate(db.engine, orders=1_000_000, seed=7)
+
+Popularity is skewed the way production traffic is: a few restaurants
+receive most orders (Zipf-like weights), a few heavy users place many of
+them, and larger countries hold more restaurants. Generated orders are
+placed or cancelled; open carts (one per user and restaurant) are left to
+the app.
+"""
+import itertools
+import random
+import time
+from array import array
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from werkzeug.security import generate_password_hash
+
+from backend.catalog import bump_catalog_version
+from backend.reports import rebuild_sales_rollups
+from backend.models import (
+    ChangeSequence, MenuItem, Order, OrderItem, PaymentMethod, Restaurant, User
+)
+
+BASE_COUNTRIES = ["India", "America"]
+STATUSES = ["placed"] * 88 + ["cancelled"] * 12
+DISHES = [
+    "Butter Chicken", "Naan", "Veg Biryani", "Chicken Biryani", "Burger",
+    "Fries", "Pepperoni Pizza", "Margherita Pizza", "Paneer Tikka", "Dal Makhani",
+    "Masala Dosa", "Caesar Salad", "Tacos", "Ramen", "Sushi Roll", "Pad Thai",
+    "Falafel Wrap", "Pho", "Lasagna", "Chocolate Cake",
+]
+KINDS = ["Kitchen", "House", "Point", "Hub", "Grill", "Cafe", "Diner", "Express"]
+BATCH = 50_000
+
+
+class DatagenError(ValueError):
+    pass
+
+
+def _zipf_cum_weights(n, s, rng):
+    """Cumulative Zipf(s) weights over n items in a shuffled rank order."""
+    ranks = list(range(1, n + 1))
+    rng.shuffle(ranks)
+    return list(itertools.accumulate(1.0 / (r ** s) for r in ranks))
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+
+def generate(engine, countries=2, users=100, restaurants=200, menu_items=2000,
+             orders=10_000, days=365, max_lines=5, seed=0, log=print):
+    """Append a synthetic dataset to the database behind `engine`.
+
+    Returns a dict with the number of rows inserted per table. Raises
+    DatagenError if orders are asked for but no restaurant can take them.
+    """
+    if orders > 0 and (users < 1 or restaurants < 1):
+        raise DatagenError("Orders need at least one user and one restaurant")
+
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    country_names = (BASE_COUNTRIES + [f"Country-{i:02d}" for i in range(3, countries + 1)])[:countries]
+
+    def progress(message):
+        if log:
+            log(f"[{time.perf_counter() - started:7.1f}s] {message}")
+
+    with engine.connect() as conn:
+        # ---- COUNTRIES: bigger ones hold more restaurants and users ----
+        country_cum = _zipf_cum_weights(countries, 0.8, rng)
+
+        # ---- USERS: one manager per country, the rest members ----
+        password_hash = generate_password_hash("password")
+        user_start = _next_id(conn, User)
+        user_country = [rng.choices(country_names, cum_weights=country_cum)[0] for _ in range(users)]
+        for i, name in enumerate(country_names[:users]):
+            user_country[i] = name
+
+        rows = []
+        for i, country in enumerate(user_country):
+            uid = user_start + i
+            rows.append({
+                "id": uid,
+                "username": f"user{uid}",
+                "password_hash": password_hash,
+                "role": "manager" if i < countries else "member",
+                "country": country,
+            })
+        for chunk in _chunks(rows, BATCH):
+            conn.execute(User.__table__.insert(), chunk)
+        conn.execute(PaymentMethod.__table__.insert(), [
+            {"user_id": user_start + i, "method_name": "Card", "card_last4": f"{i % 10000:04d}"}
+            for i in range(min(users, countries))
+        ])
+        conn.commit()
+        progress(f"{users} users")
+
+        users_by_country = {}
+        for i, country in enumerate(user_country):
+            users_by_country.setdefault(country, []).append(user_start + i)
+        # Heavy users: activity within each country is Zipf-distributed
+        user_cum = {
+            c: _zipf_cum_weights(len(ids), 1.1, rng) for c, ids in users_by_country.items()
+        }
+
+        # ---- RESTAURANTS + MENUS ----
+        rest_start = _next_id(conn, Restaurant)
+        item_start = _next_id(conn, MenuItem)
+        per_menu = max(1, menu_items // max(restaurants, 1))
+
+        rest_country = []
+        menu_first = array("q")
+        menu_count = array("l")
+        prices = array("d")
+
+        next_item = item_start
+        for chunk_start in range(0, restaurants, BATCH):
+            rest_rows, item_rows = [], []
+            for i in range(chunk_start, min(chunk_start + BATCH, restaurants)):
+                rid = rest_start + i
+                country = rng.choices(country_names, cum_weights=country_cum)[0]
+                rest_country.append(country)
+                rest_rows.append({
+                    "id": rid,
+                    "name": f"{rng.choice(DISHES).split()[0]} {rng.choice(KINDS)} {rid}",
+                    "country": country,
+                })
+
+                count = max(1, int(rng.gauss(per_menu, per_menu / 4)))
+                menu_first.append(next_item)
+                menu_count.append(count)
+                for _ in range(count):
+                    price = round(rng.uniform(2, 250), 2)
+                    prices.append(price)
+                    item_rows.append({
+                        "id": next_item,
+                        "restaurant_id": rid,
+                        "name": rng.choice(DISHES),
+                        "price": price,
+                    })
+                    next_item += 1
+
+            conn.execute(Restaurant.__table__.insert(), rest_rows)
+            for items in _chunks(item_rows, BATCH):
+                conn.execute(MenuItem.__table__.insert(), items)
+            bump_catalog_version(conn)
+            conn.commit()
+            progress(f"{min(chunk_start + BATCH, restaurants)} restaurants, {next_item - item_start} menu items")
+
+        # Only restaurants whose country has users can receive orders
+        orderable = [i for i in range(restaurants) if rest_country[i] in users_by_country]
+        if orders > 0 and not orderable:
+            raise DatagenError("No restaurant is in a country with users; add more users")
+        rest_cum = _zipf_cum_weights(len(orderable), 1.05, rng)
+
+        # ---- ORDERS + ORDER ITEMS ----
+        order_start = _next_id(conn, Order)
+        seq_start = (conn.execute(select(ChangeSequence.value)).scalar() or 0) + 1
+        now = datetime.utcnow()
+        span = days * 86400
+        line_count = 0
+
+        for chunk_start in range(0, orders, BATCH):
+            n = min(BATCH, orders - chunk_start)
+            picks = rng.choices(orderable, cum_weights=rest_cum, k=n)
+            order_rows, line_rows = [], []
+
+            for offset, r in enumerate(picks):
+                oid = order_start + chunk_start + offset
+                country = rest_country[r]
+                uid = rng.choices(users_by_country[country], cum_weights=user_cum[country])[0]
+
+                first, count = menu_first[r], menu_count[r]
+                lines = rng.sample(range(count), min(count, rng.randint(1, max_lines)))
+                total = 0.0
+                for k in lines:
+                    qty = rng.randint(1, 3)
+                    price = prices[first + k - item_start]
+                    total += qty * price
+                    line_rows.append({
+                        "order_id": oid,
+                        "menu_item_id": first + k,
+                        "qty": qty,
+                        "unit_price": price,
+                    })
+
+                status = rng.choice(STATUSES)
+                order_rows.append({
+                    "id": oid,
+                    "user_id": uid,
+                    "restaurant_id": rest_start + r,
+                    "status": status,
+                    "total": round(total, 2),
+                    # Progressive in id order, with jitter, like real traffic
+                    "created_at": now - timedelta(seconds=span * (1 - (chunk_start + offset) / orders) + rng.random() * 60),
+                    "country": country,
+                    "added_by": f"user{uid}",
+                    "cancelled_by": f"user{uid}" if status == "cancelled" else None,
+                    "change_seq": seq_start + chunk_start + offset,
+                })
+
+            conn.execute(Order.__table__.insert(), order_rows)
+            for lines in _chunks(line_rows, BATCH):
+                conn.execute(OrderItem.__table__.insert(), lines)
+            line_count += len(line_rows)
+            conn.commit()
+            progress(f"{chunk_start + n} orders, {line_count} order items")
+
+        conn.exec_driver_sql(
+            "INSERT INTO change_sequence (id, value) VALUES (1, ?) "
+            "ON CONFLICT (id) DO UPDATE SET value = excluded.value",
+            (seq_start + orders - 1,)
+        )
+        conn.commit()
+
+        buckets = rebuild_sales_rollups(conn)
+        conn.commit()
+        progress(f"{buckets} sales rollup buckets")
+
+    progress("done")
+    return {
+        "user": users,
+        "restaurant": restaurants,
+        "menu_item": next_item - item_start,
+        "order": orders,
+        "order_item": line_count,
+    }
@@ -1,5 +1,6 @@
 # backend/db_init.py
 from backend.models import db, User, Restaurant, MenuItem, PaymentMethod
+from backend.sharding import shard_for_country, use_shard
 
 def seed_data():
     # If users already exist → skip seeding
@@ -26,29 +27,31 @@ def seed_data():
 
     db.session.commit()
 
-    # ---- RESTAURANTS ----
-    r1 = Restaurant(name="Spice India", country="India")
-    r2 = Restaurant(name="Biryani House", country="India")
-    r3 = Restaurant(name="Burger Point", country="America")
-    r4 = Restaurant(name="Pizza Hub", country="America")
-
-    db.session.add_all([r1, r2, r3, r4])
-    db.session.commit()
-
-    # ---- MENU ----
-    items = [
-        MenuItem(restaurant_id=r1.id, name="Butter Chicken", price=100.00),
-        MenuItem(restaurant_id=r1.id, name="Naan", price=15.00),
-        MenuItem(restaurant_id=r2.id, name="Veg Biryani", price=150.00),
-        MenuItem(restaurant_id=r2.id, name="Chicken Biryani", price=180.00),
-        MenuItem(restaurant_id=r3.id, name="Burger", price=6.49),
-        MenuItem(restaurant_id=r3.id, name="Fries", price=2.99),
-        MenuItem(restaurant_id=r4.id, name="Pepperoni Pizza", price=9.49),
-        MenuItem(restaurant_id=r4.id, name="Margherita Pizza", price=8.79)
-    ]
-
-    db.session.add_all(items)
-    db.session.commit()
+    # ---- RESTAURANTS & MENUS ----
+    # Each country goes to its own shard when sharding is on
+    catalog = {
+        "India": [
+            ("Spice India", [("Butter Chicken", 100.00), ("Naan", 15.00)]),
+            ("Biryani House", [("Veg Biryani", 150.00), ("Chicken Biryani", 180.00)]),
+        ],
+        "America": [
+            ("Burger Point", [("Burger", 6.49), ("Fries", 2.99)]),
+            ("Pizza Hub", [("Pepperoni Pizza", 9.49), ("Margherita Pizza", 8.79)]),
+        ],
+    }
+
+    for country, restaurants in catalog.items():
+        with use_shard(shard_for_country(country)):
+            rows = [Restaurant(name=name, country=country) for name, _ in restaurants]
+            db.session.add_all(rows)
+            db.session.commit()
+
+            db.session.add_all([
+                MenuItem(restaurant_id=r.id, name=name, price=price)
+                for r, (_, menu) in zip(rows, restaurants)
+                for name, price in menu
+            ])
+            db.session.commit()
 
     # ---- ADMIN PAYMENT ----
     admin = User.query.filter_by(username="nick").first()
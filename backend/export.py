@@ -0,0 +1,156 @@
+import zlib
+from itertools import groupby
+
+from flask import Response, request, stream_with_context
+from sqlalchemy import func, select, union_all
+
+from backend.models import db
+from backend.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, page_limit
+from backend.serializers import dumps
+from backend.sharding import use_shard
+
+
+# ------------------------------------------------------------
+# STREAMING EXPORTS
+# ------------------------------------------------------------
+# Large admin listings (?all=1) are streamed instead of being built in
+# memory. Rows are read in keyset batches on id, serialized, written out
+# and dropped from the session before the next batch, so memory stays
+# flat however large the table is.
+#
+#   ?format=json    (default) one JSON array, same shape as before
+#   ?format=ndjson  one JSON object per line
+#   ?limit=N        stop after N rows; X-Next-Cursor resumes the export
+#   ?cursor=...     resume token from a previous X-Next-Cursor
+#
+# Output is gzip-compressed on the fly when the client accepts it
+# (disable with ?gzip=0).
+#
+# Extra sources (e.g. the order archive, or other country shards) are
+# merged in by id, batch by batch, as if they were one table. A source may
+# name the shard it is read from; shards hold increasing id ranges.
+
+EXPORT_BATCH_SIZE = 500
+
+
+def _batch(sources, after_id, size):
+    rows = []
+    for query, id_column, shard in sources:
+        if after_id is not None:
+            query = query.filter(id_column > after_id)
+        with use_shard(shard):
+            rows.extend(query.order_by(id_column).limit(size).all())
+    if len(sources) > 1:
+        rows.sort(key=lambda row: row.id)
+    return rows[:size]
+
+
+def _chunks(sources, serialize, after_id, limit, fmt, batch_size):
+    sent = 0
+    first = True
+
+    if fmt == "json":
+        yield b"["
+
+    while limit is None or sent < limit:
+        size = batch_size if limit is None else min(batch_size, limit - sent)
+        rows = _batch(sources, after_id, size)
+        if not rows:
+            break
+
+        parts = []
+        for row in rows:
+            data = dumps(serialize(row))
+            if fmt == "ndjson":
+                parts.append(data + b"\n")
+            else:
+                parts.append(data if first else b"," + data)
+                first = False
+        yield b"".join(parts)
+
+        sent += len(rows)
+        after_id = rows[-1].id
+
+        # Keep the identity map (and memory) from growing batch over batch
+        db.session.expunge_all()
+
+        if len(rows) < size:
+            break
+
+    if fmt == "json":
+        yield b"]"
+
+    db.session.close()
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _boundary(sources, after_id, limit):
+    """Id of the limit-th row after `after_id` if more rows follow, else None."""
+    found = []
+    offset = limit - 1
+    # Shards in order: skip whole shards by count until the boundary is reached
+    for shard, group in groupby(sources, key=lambda s: s[2]):
+        selects = []
+        for q, column, _ in group:
+            q = q.with_entities(column.label("id"))
+            if after_id is not None:
+                q = q.filter(column > after_id)
+            selects.append(q.statement)
+        ids = (union_all(*selects) if len(selects) > 1 else selects[0]).subquery()
+
+        with use_shard(shard):
+            found += db.session.execute(
+                select(ids.c.id).order_by(ids.c.id).offset(offset).limit(2 - len(found))
+            ).scalars().all()
+            if len(found) == 2:
+                return found[0]
+            if found:
+                offset = 0
+            else:
+                offset -= db.session.execute(select(func.count()).select_from(ids)).scalar()
+    return None
+
+
+def export_response(query, id_column, serialize, batch_size=EXPORT_BATCH_SIZE, extra=(), shard=None):
+    """Stream every row of `query` (ordered by `id_column`) as JSON/NDJSON.
+
+    `extra` is a sequence of further (query, id_column[, shard]) sources
+    with disjoint ids, merged in id order. `shard` is the shard `query` is
+    read from.
+    """
+    sources = [(query, id_column, shard)] + [
+        (source + (None,))[:3] for source in extra
+    ]
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "ndjson"):
+        fmt = "json"
+
+    limit = page_limit(default=None, maximum=10 ** 9)
+    cursor = request.args.get("cursor")
+    after_id = decode_cursor(cursor, 1)[0] if cursor else None
+
+    headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding"}
+
+    # The resume token has to be known before the body is streamed: it is
+    # the id of the last row this response will contain, if more follow.
+    if limit is not None:
+        boundary = _boundary(sources, after_id, limit)
+        if boundary is not None:
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(boundary)
+
+    body = _chunks(sources, serialize, after_id, limit, fmt, batch_size)
+
+    if request.args.get("gzip") != "0" and "gzip" in request.accept_encodings:
+        body = _gzip(body)
+        headers["Content-Encoding"] = "gzip"
+
+    mimetype = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
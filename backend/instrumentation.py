@@ -0,0 +1,261 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import Response, abort, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from backend.models import db
+from backend.serializers import FastJSONProvider
+
+
+# ------------------------------------------------------------
+# PER-REQUEST SQL + TIMING INSTRUMENTATION (opt-in)
+# ------------------------------------------------------------
+# Enabled with INSTRUMENTATION=1. Each request then records its SQL
+# statement count, total DB time, slowest statement and JSON
+# serialization time, and reports them in a Server-Timing header and one
+# JSON log line (logger "backend.instrumentation"). Per-route histograms
+# are served at /metrics in Prometheus text format; they are per worker
+# process, like every other in-process counter here.
+#
+# A statement repeated more than N_PLUS_ONE_THRESHOLD times in a request
+# is flagged as a likely N+1 query.
+#
+# When disabled nothing is registered: no engine events, request hooks,
+# JSON provider or route.
+
+log = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+_PLACEHOLDERS = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_statement(statement):
+    """Collapse whitespace and expanded IN (?, ?, ...) lists."""
+    return _PLACEHOLDERS.sub("?", _WHITESPACE.sub(" ", statement).strip())
+
+
+class RequestMetrics:
+    __slots__ = ("started", "statements", "db_time", "slowest", "slowest_time",
+                 "serialize_time", "counts")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest = None
+        self.slowest_time = 0.0
+        self.serialize_time = 0.0
+        self.counts = Counter()
+
+    def record(self, statement, elapsed):
+        self.statements += 1
+        self.db_time += elapsed
+        self.counts[normalize_statement(statement)] += 1
+        if elapsed > self.slowest_time:
+            self.slowest, self.slowest_time = statement, elapsed
+
+    def repeated(self, threshold):
+        return [(sql, n) for sql, n in self.counts.items() if n > threshold]
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """Per-route histograms and counters, rendered for Prometheus."""
+
+    HISTOGRAMS = (
+        ("foodapp_request_duration_seconds", "Request latency", DURATION_BUCKETS),
+        ("foodapp_db_duration_seconds", "Time spent in SQL per request", DURATION_BUCKETS),
+        ("foodapp_serialize_duration_seconds", "JSON serialization time per request", DURATION_BUCKETS),
+        ("foodapp_sql_statements", "SQL statements per request", STATEMENT_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._n_plus_one = Counter()
+
+    def observe(self, route, method, metrics, duration, repeated):
+        values = (duration, metrics.db_time, metrics.serialize_time, metrics.statements)
+        with self._lock:
+            for (name, _, buckets), value in zip(self.HISTOGRAMS, values):
+                key = (name, route, method)
+                hist = self._histograms.get(key)
+                if hist is None:
+                    hist = self._histograms[key] = Histogram(buckets)
+                hist.observe(value)
+            if repeated:
+                self._n_plus_one[(route, method)] += 1
+
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, help_text, buckets in self.HISTOGRAMS:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (hname, route, method), hist in sorted(self._histograms.items()):
+                    if hname != name:
+                        continue
+                    labels = f'route="{route}",method="{method}"'
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.total}')
+                    lines.append(f"{name}_sum{{{labels}}} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{{{labels}}} {hist.total}")
+
+            name = "foodapp_n_plus_one_total"
+            lines.append(f"# HELP {name} Requests flagged for repeated statements")
+            lines.append(f"# TYPE {name} counter")
+            for (route, method), count in sorted(self._n_plus_one.items()):
+                lines.append(f'{name}{{route="{route}",method="{method}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedJSONProvider(FastJSONProvider):
+    """Adds JSON encoding time to the current request's metrics."""
+
+    def encode(self, obj):
+        metrics = _current_metrics()
+        if metrics is None:
+            return super().encode(obj)
+        start = time.perf_counter()
+        try:
+            return super().encode(obj)
+        finally:
+            metrics.serialize_time += time.perf_counter() - start
+
+
+# ------------------------------------------------------------
+# WIRING
+# ------------------------------------------------------------
+def _current_metrics():
+    return g.get("_request_metrics") if has_request_context() else None
+
+
+def _instrument_engine(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_instr_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["_instr_started"].pop()
+        metrics = _current_metrics()
+        if metrics is not None:
+            metrics.record(statement, time.perf_counter() - started)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("_instr_started"):
+            conn.info["_instr_started"].pop()
+
+
+def _route_label():
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+def server_timing(metrics, total):
+    parts = [
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.statements} queries"',
+        f"serialize;dur={metrics.serialize_time * 1000:.2f}",
+        f"app;dur={total * 1000:.2f}",
+    ]
+    if metrics.slowest is not None:
+        parts.insert(1, f"db-slowest;dur={metrics.slowest_time * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def init_instrumentation(app):
+    """Register hooks when app.config["INSTRUMENTATION"] is set. Call after
+    db.init_app."""
+    if not app.config.get("INSTRUMENTATION"):
+        return
+
+    threshold = app.config.get("N_PLUS_ONE_THRESHOLD", 5)
+    registry = app.extensions["metrics"] = MetricsRegistry()
+    app.json = InstrumentedJSONProvider(app)
+
+    if not log.handlers:
+        log.addHandler(logging.StreamHandler())
+        log.setLevel(logging.INFO)
+        log.propagate = False
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not getattr(engine, "_foodapp_instrumented", False):
+                _instrument_engine(engine)
+                engine._foodapp_instrumented = True
+
+    @app.before_request
+    def _start_metrics():
+        g._request_metrics = RequestMetrics()
+
+    @app.after_request
+    def _server_timing(response):
+        metrics = g.get("_request_metrics")
+        if metrics is not None:
+            response.headers["Server-Timing"] = server_timing(
+                metrics, time.perf_counter() - metrics.started
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_metrics(exc):
+        # Runs after streamed bodies are exhausted, so their SQL is included
+        metrics = g.pop("_request_metrics", None)
+        if metrics is None or request.endpoint == "metrics":
+            return
+        duration = time.perf_counter() - metrics.started
+        repeated = metrics.repeated(threshold)
+        route = _route_label()
+        registry.observe(route, request.method, metrics, duration, repeated)
+
+        line = {
+            "event": "request",
+            "method": request.method,
+            "route": route,
+            "path": request.path,
+            "duration_ms": round(duration * 1000, 2),
+            "sql_count": metrics.statements,
+            "db_ms": round(metrics.db_time * 1000, 2),
+            "slowest_sql_ms": round(metrics.slowest_time * 1000, 2),
+            "slowest_sql": metrics.slowest and normalize_statement(metrics.slowest),
+            "serialize_ms": round(metrics.serialize_time * 1000, 2),
+        }
+        if exc is not None:
+            line["error"] = type(exc).__name__
+        if repeated:
+            line["n_plus_one"] = [{"sql": sql, "count": n} for sql, n in repeated]
+        log.log(logging.WARNING if repeated else logging.INFO, json.dumps(line))
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        token = current_app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            abort(401)
+        return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,152 @@
+from backend.models import db
+from backend.reports import rebuild_sales_rollups
+from backend.search import create_search_index, rebuild_search_index
+
+
+# ------------------------------------------------------------
+# VERSIONED SCHEMA MIGRATIONS
+# ------------------------------------------------------------
+# db.create_all() only creates missing tables; it never touches tables
+# that already exist. Changes to existing tables (indexes, columns,
+# constraints) are applied here, in order, and the schema version is
+# stored in SQLite's PRAGMA user_version.
+#
+# Migrations run after create_all(), so every step must be idempotent:
+# on a fresh database the tables already have the latest shape.
+
+MIGRATIONS = []
+
+
+def migration(version, description):
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return decorator
+
+
+def schema_version(conn):
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def latest_version():
+    return max(v for v, _, _ in MIGRATIONS)
+
+
+def upgrade(engine=None):
+    """Create missing tables and apply pending migrations, on `engine` or
+    on every configured database (main and country shards).
+
+    Returns the list of (version, description) steps that were applied.
+    """
+    if engine is None:
+        applied = []
+        for bound in db.engines.values():
+            applied += [step for step in upgrade(bound) if step not in applied]
+        return applied
+
+    # Every database gets every table; each only fills its own
+    db.metadata.create_all(engine)
+
+    applied = []
+    with engine.connect() as conn:
+        current = schema_version(conn)
+        for version, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+            if version <= current:
+                continue
+            fn(conn)
+            conn.exec_driver_sql(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+            applied.append((version, description))
+    return applied
+
+
+def _has_column(conn, table, column):
+    rows = conn.exec_driver_sql(f'PRAGMA table_info("{table}")').fetchall()
+    return any(row[1] == column for row in rows)
+
+
+def _add_column(conn, table, column, ddl):
+    if not _has_column(conn, table, column):
+        conn.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}')
+
+
+# ------------------------------------------------------------
+# MIGRATION STEPS
+# ------------------------------------------------------------
+@migration(1, "indexes for hot query shapes")
+def _hot_path_indexes(conn):
+    for ddl in (
+        'CREATE INDEX IF NOT EXISTS ix_restaurant_country_id ON restaurant (country, id)',
+        'CREATE INDEX IF NOT EXISTS ix_menu_item_restaurant_id ON menu_item (restaurant_id)',
+        'CREATE INDEX IF NOT EXISTS ix_payment_method_user_id ON payment_method (user_id)',
+        'CREATE INDEX IF NOT EXISTS ix_order_user_status_restaurant ON "order" (user_id, status, restaurant_id)',
+        'CREATE INDEX IF NOT EXISTS ix_order_country_created ON "order" (country, created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_order_user_created ON "order" (user_id, created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_order_created ON "order" (created_at, id)',
+        'CREATE INDEX IF NOT EXISTS ix_order_item_order_id ON order_item (order_id, menu_item_id)',
+    ):
+        conn.exec_driver_sql(ddl)
+
+
+@migration(2, "catalog version counter")
+def _catalog_version(conn):
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 1)"
+    )
+
+
+@migration(3, "order line price snapshot and unique (order_id, menu_item_id)")
+def _order_item_lines(conn):
+    _add_column(conn, "order_item", "unit_price", "FLOAT NOT NULL DEFAULT 0")
+    conn.exec_driver_sql(
+        "UPDATE order_item SET unit_price = "
+        "(SELECT price FROM menu_item WHERE menu_item.id = order_item.menu_item_id) "
+        "WHERE unit_price = 0"
+    )
+
+    # Merge duplicate lines into the oldest one before adding the constraint
+    conn.exec_driver_sql(
+        "UPDATE order_item SET qty = ("
+        "  SELECT SUM(COALESCE(o2.qty, 1)) FROM order_item o2"
+        "  WHERE o2.order_id = order_item.order_id"
+        "  AND o2.menu_item_id = order_item.menu_item_id"
+        ") WHERE id IN ("
+        "  SELECT MIN(id) FROM order_item GROUP BY order_id, menu_item_id HAVING COUNT(*) > 1"
+        ")"
+    )
+    conn.exec_driver_sql(
+        "DELETE FROM order_item WHERE id NOT IN ("
+        "  SELECT MIN(id) FROM order_item GROUP BY order_id, menu_item_id"
+        ")"
+    )
+
+    conn.exec_driver_sql("DROP INDEX IF EXISTS ix_order_item_order_id")
+    conn.exec_driver_sql(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_order_item_order_menu_item "
+        "ON order_item (order_id, menu_item_id)"
+    )
+
+
+@migration(4, "order change feed sequence")
+def _order_change_seq(conn):
+    _add_column(conn, "order", "change_seq", "INTEGER NOT NULL DEFAULT 0")
+    conn.exec_driver_sql('UPDATE "order" SET change_seq = id WHERE change_seq = 0')
+    conn.exec_driver_sql(
+        "INSERT OR IGNORE INTO change_sequence (id, value) "
+        'SELECT 1, COALESCE(MAX(change_seq), 0) FROM "order"'
+    )
+    conn.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_order_change_seq ON "order" (change_seq)')
+    conn.exec_driver_sql(
+        'CREATE INDEX IF NOT EXISTS ix_order_country_change_seq ON "order" (country, change_seq)'
+    )
+
+
+@migration(5, "sales rollups")
+def _sales_rollups(conn):
+    rebuild_sales_rollups(conn)
+
+
+@migration(6, "menu full-text search index")
+def _menu_search(conn):
+    create_search_index(conn)
+    rebuild_search_index(conn)
@@ -4,7 +4,10 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime
 from flask_login import UserMixin
 
-db = SQLAlchemy()
+from backend.sharding import ShardRoutingSession
+
+# Routes country-sharded tables to their shard when SHARD_COUNTRIES is set
+db = SQLAlchemy(session_options={"class_": ShardRoutingSession})
 
 
 # ------------------------------------------------------------
@@ -21,8 +24,8 @@ class User(UserMixin, db.Model):
     # Country (India / America)
     country = db.Column(db.String(50), nullable=True)
 
-    def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+    def set_password(self, password, method="pbkdf2"):
+        self.password_hash = generate_password_hash(password, method=method)
 
     def check_password(self, pwd):
         return check_password_hash(self.password_hash, pwd)
@@ -42,6 +45,11 @@ class User(UserMixin, db.Model):
 # RESTAURANTS
 # ------------------------------------------------------------
 class Restaurant(db.Model):
+    __table_args__ = (
+        # Country-scoped listings, ordered by id for keyset pagination
+        db.Index("ix_restaurant_country_id", "country", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(120), nullable=False)
 
@@ -60,6 +68,10 @@ class Restaurant(db.Model):
 # MENU ITEMS
 # ------------------------------------------------------------
 class MenuItem(db.Model):
+    __table_args__ = (
+        db.Index("ix_menu_item_restaurant_id", "restaurant_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     restaurant_id = db.Column(
@@ -77,6 +89,10 @@ class MenuItem(db.Model):
 # PAYMENT METHODS
 # ------------------------------------------------------------
 class PaymentMethod(db.Model):
+    __table_args__ = (
+        db.Index("ix_payment_method_user_id", "user_id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     user_id = db.Column(
@@ -96,6 +112,18 @@ class PaymentMethod(db.Model):
 # ORDER MODEL
 # ------------------------------------------------------------
 class Order(db.Model):
+    __table_args__ = (
+        # Cart lookup (user, status, restaurant) and "my open carts"
+        db.Index("ix_order_user_status_restaurant", "user_id", "status", "restaurant_id"),
+        # /api/myorders keyset scans: per country, per user, and admin-wide
+        db.Index("ix_order_country_created", "country", "created_at", "id"),
+        db.Index("ix_order_user_created", "user_id", "created_at", "id"),
+        db.Index("ix_order_created", "created_at", "id"),
+        # Change feed: ?since=<seq> and the SSE stream
+        db.Index("ix_order_change_seq", "change_seq"),
+        db.Index("ix_order_country_change_seq", "country", "change_seq"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     user_id = db.Column(
@@ -132,12 +160,21 @@ class Order(db.Model):
     added_by = db.Column(db.String(50))
     cancelled_by = db.Column(db.String(50))
 
+    # Position in the order change feed, assigned on every insert/update
+    # from ChangeSequence (see backend/changes.py)
+    change_seq = db.Column(db.Integer, nullable=False, default=0)
+
 
 
 # ------------------------------------------------------------
 # ORDER ITEMS
 # ------------------------------------------------------------
 class OrderItem(db.Model):
+    __table_args__ = (
+        # One line per menu item in an order; repeated adds bump qty
+        db.Index("uq_order_item_order_menu_item", "order_id", "menu_item_id", unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     order_id = db.Column(
@@ -154,4 +191,101 @@ class OrderItem(db.Model):
 
     qty = db.Column(db.Integer, default=1)
 
+    # Price snapshot taken when the line was created, so totals and
+    # checkout never need to join MenuItem
+    unit_price = db.Column(db.Float, nullable=False, default=0.0)
+
+    menu_item = db.relationship('MenuItem')
+
+
+
+# ------------------------------------------------------------
+# CATALOG VERSION
+# ------------------------------------------------------------
+# Single-row counter bumped in the same transaction as any change to
+# restaurants or menu items. Every worker compares it with the version
+# of its cached catalog entries (see backend/catalog.py).
+class CatalogVersion(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+
+
+
+# ------------------------------------------------------------
+# ORDER CHANGE SEQUENCE
+# ------------------------------------------------------------
+# Single-row counter behind Order.change_seq. It is bumped inside the
+# writing transaction, and SQLite allows one writer at a time, so
+# sequence numbers become visible to readers in increasing order.
+class ChangeSequence(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+
+
+# ------------------------------------------------------------
+# SALES ROLLUP
+# ------------------------------------------------------------
+# Order count and revenue per (day, country, restaurant, status) for
+# placed and cancelled orders, kept current by checkout and cancel (see
+# backend/reports.py). Reports read buckets, never orders.
+class SalesRollup(db.Model):
+    __table_args__ = (
+        db.Index("ix_sales_rollup_country_day", "country", "day"),
+    )
+
+    day = db.Column(db.Date, primary_key=True)
+    country = db.Column(db.String(50), primary_key=True)
+    restaurant_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(30), primary_key=True)
+
+    orders = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Float, nullable=False, default=0.0)
+
+
+
+# ------------------------------------------------------------
+# ORDER ARCHIVE (cold storage)
+# ------------------------------------------------------------
+# Placed and cancelled orders older than ORDER_ARCHIVE_DAYS are moved
+# here with their lines (see backend/archive.py), keeping their ids, so
+# the hot order tables only hold recent orders and open carts. Same
+# columns and listing indexes as Order / OrderItem; archived orders are
+# read-only.
+class OrderArchive(db.Model):
+    __tablename__ = "order_archive"
+    __table_args__ = (
+        db.Index("ix_order_archive_country_created", "country", "created_at", "id"),
+        db.Index("ix_order_archive_user_created", "user_id", "created_at", "id"),
+        db.Index("ix_order_archive_created", "created_at", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    restaurant_id = db.Column(db.Integer, db.ForeignKey('restaurant.id'), nullable=False)
+    status = db.Column(db.String(30))
+    total = db.Column(db.Float, default=0.0)
+    created_at = db.Column(db.DateTime)
+    country = db.Column(db.String(50), nullable=True)
+    added_by = db.Column(db.String(50))
+    cancelled_by = db.Column(db.String(50))
+    change_seq = db.Column(db.Integer, nullable=False, default=0)
+
+    items = db.relationship('OrderItemArchive', order_by='OrderItemArchive.id')
+    restaurant = db.relationship('Restaurant')
+
+
+class OrderItemArchive(db.Model):
+    __tablename__ = "order_item_archive"
+    __table_args__ = (
+        db.Index("ix_order_item_archive_order_id", "order_id"),
+    )
+
+    # Own ids, not the order_item ones: SQLite can hand those out again
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey('order_archive.id'), nullable=False)
+    menu_item_id = db.Column(db.Integer, db.ForeignKey('menu_item.id'), nullable=False)
+    qty = db.Column(db.Integer, default=1)
+    unit_price = db.Column(db.Float, nullable=False, default=0.0)
+
     menu_item = db.relationship('MenuItem')
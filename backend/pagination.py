@@ -0,0 +1,85 @@
+import base64
+import json
+from datetime import datetime
+
+from flask import request
+
+
+# ------------------------------------------------------------
+# KEYSET (CURSOR) PAGINATION HELPERS
+# ------------------------------------------------------------
+# Cursors are opaque to clients: a url-safe base64 JSON list holding the
+# sort key of the last row of the previous page. The next cursor is sent
+# back in the X-Next-Cursor header so list bodies keep their old shape.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Return the list of `size` key values stored in `token`."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise PaginationError("Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise PaginationError("Invalid cursor")
+    return values
+
+
+def page_limit(default=None, maximum=500):
+    """Read ?limit= from the request. Returns `default` when absent."""
+    raw = request.args.get("limit")
+    if raw is None or raw == "":
+        return default
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise PaginationError("Invalid limit")
+    if limit < 1:
+        raise PaginationError("Invalid limit")
+    return min(limit, maximum)
+
+
+def request_fields(allowed, default):
+    """Parse ?fields=a,b,c into a set, validated against `allowed`."""
+    raw = request.args.get("fields")
+    if not raw:
+        return set(default)
+
+    fields = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = fields - set(allowed)
+    if unknown:
+        raise PaginationError("Unknown fields: " + ",".join(sorted(unknown)))
+    return fields
+
+
+def datetime_arg(name):
+    """Parse an ISO-8601 date or datetime query argument, or None."""
+    raw = request.args.get(name)
+    if not raw:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise PaginationError("Invalid " + name)
+
+
+def int_arg(name):
+    raw = request.args.get(name)
+    if raw is None or raw == "":
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        raise PaginationError("Invalid " + name)
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from flask import current_app
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+)
+
+
+# ------------------------------------------------------------
+# BOUNDED PASSWORD VERIFICATION
+# ------------------------------------------------------------
+# PBKDF2 with hundreds of thousands of iterations is deliberately slow.
+# Verification runs on a small per-worker thread pool (hashlib releases
+# the GIL while hashing) with a hard cap on queued attempts, so a login
+# burst is rejected early instead of pinning every worker's CPU.
+
+DEFAULT_HASH_METHOD = f"pbkdf2:sha256:{DEFAULT_PBKDF2_ITERATIONS}"
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+class PasswordPool:
+    def __init__(self, max_workers=2, max_pending=8, timeout=10.0):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password"
+        )
+        # Running + queued verifications
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def hash(self, password, method):
+        return self._run(generate_password_hash, password, method)
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordPoolBusy()
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise PasswordPoolBusy()
+
+
+def init_password_pool(app):
+    app.extensions["password_pool"] = PasswordPool(
+        max_workers=app.config.get("PASSWORD_WORKERS", 2),
+        max_pending=app.config.get("PASSWORD_QUEUE", 8),
+        timeout=app.config.get("PASSWORD_TIMEOUT", 10.0),
+    )
+
+
+def password_pool():
+    return current_app.extensions["password_pool"]
+
+
+# ------------------------------------------------------------
+# REHASH ON LOGIN
+# ------------------------------------------------------------
+def normalize_method(method):
+    """Expand Werkzeug shorthands ("pbkdf2", "pbkdf2:sha256") to the full
+    method string stored at the start of a hash."""
+    parts = method.split(":")
+    if parts[0] == "pbkdf2":
+        hash_name = parts[1] if len(parts) > 1 else "sha256"
+        iterations = parts[2] if len(parts) > 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    if parts[0] == "scrypt" and len(parts) == 1:
+        return "scrypt:32768:8:1"
+    return method
+
+
+def needs_rehash(pwhash, method):
+    return pwhash.split("$", 1)[0] != normalize_method(method)
@@ -0,0 +1,73 @@
+from flask import g, has_request_context
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.orm import with_loader_criteria
+
+from backend.models import db, Order, OrderArchive, PaymentMethod, Restaurant
+
+
+# ------------------------------------------------------------
+# ROW-LEVEL ACCESS POLICY
+# ------------------------------------------------------------
+# Which rows a user may see is decided once, here, and compiled into
+# loader criteria added to every ORM query in the request:
+#
+#   admin     everything
+#   manager   restaurants and orders of their country, own payment methods
+#   member    same as manager
+#
+# Out-of-scope rows are never loaded, so routes treat them like missing
+# rows (404) and the country filter can use the (country, ...) indexes.
+# Role checks (who may cancel, see reports...) stay in the decorators of
+# backend/auth.py.
+#
+# Queries outside a request (CLI, bench, data generation) are not scoped.
+# Shared caches read with .execution_options(policy_scope=False) and
+# check the cached entry with allows_country().
+
+SCOPED_MODELS = (Restaurant, Order, OrderArchive, PaymentMethod)
+
+
+def allows_country(user, country):
+    return user.role == "admin" or country == user.country
+
+
+def scope_criteria(user):
+    """Loader criteria options limiting queries to what `user` may see."""
+    if user.role == "admin":
+        return ()
+    country = user.country
+    user_id = user.id
+    return (
+        with_loader_criteria(Restaurant, lambda cls: cls.country == country, include_aliases=True),
+        with_loader_criteria(Order, lambda cls: cls.country == country, include_aliases=True),
+        with_loader_criteria(OrderArchive, lambda cls: cls.country == country, include_aliases=True),
+        with_loader_criteria(PaymentMethod, lambda cls: cls.user_id == user_id, include_aliases=True),
+    )
+
+
+def request_scope():
+    """Criteria for the current user, compiled once per request."""
+    if "_policy_criteria" not in g:
+        g._policy_criteria = scope_criteria(current_user) if current_user.is_authenticated else ()
+    return g._policy_criteria
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _apply_scope(execute_state):
+    if not has_request_context():
+        return
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    # Lazy/eager loads inherit the criteria of the query that started them
+    if execute_state.is_select and (execute_state.is_column_load or execute_state.is_relationship_load):
+        return
+    if not execute_state.execution_options.get("policy_scope", True):
+        return
+    # Checked before touching current_user: loading it runs a User query
+    if not any(m.class_ in SCOPED_MODELS for m in execute_state.all_mappers):
+        return
+
+    criteria = request_scope()
+    if criteria:
+        execute_state.statement = execute_state.statement.options(*criteria)
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, select
+
+from backend.models import db, User
+
+
+# ------------------------------------------------------------
+# AUTHENTICATED PRINCIPAL CACHE
+# ------------------------------------------------------------
+# Flask-Login calls load_user on every authenticated request. Routes only
+# need id / username / role / country, so those are cached per worker for
+# a short TTL instead of loading the User row each time. Changes to a
+# User flushed in this worker drop its entry immediately; other workers
+# pick the change up when the TTL expires.
+
+class Principal(UserMixin):
+    __slots__ = ("id", "username", "role", "country")
+
+    def __init__(self, id, username, role, country):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.country = country
+
+    def is_admin(self):
+        return self.role == "admin"
+
+    def is_manager(self):
+        return self.role == "manager"
+
+    def is_member(self):
+        return self.role == "member"
+
+
+class PrincipalCache:
+    def __init__(self, ttl=30.0, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+
+        row = db.session.execute(
+            select(User.id, User.username, User.role, User.country)
+            .where(User.id == user_id)
+        ).first()
+        if row is None:
+            self.invalidate(user_id)
+            return None
+
+        principal = Principal(*row)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[user_id] = (time.monotonic() + self.ttl, principal)
+        return principal
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+
+def init_principal_cache(app):
+    app.extensions["principal_cache"] = PrincipalCache(
+        ttl=app.config.get("PRINCIPAL_CACHE_TTL", 30.0)
+    )
+
+
+def principal_cache():
+    return current_app.extensions["principal_cache"]
+
+
+@event.listens_for(db.session, "after_flush")
+def _invalidate_changed_users(session, flush_context):
+    if not has_app_context() or "principal_cache" not in current_app.extensions:
+        return
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            principal_cache().invalidate(obj.id)
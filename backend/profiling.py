@@ -0,0 +1,288 @@
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from flask import Response, abort, current_app, jsonify, request
+from flask_login import current_user, login_required
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.exceptions import HTTPException
+from werkzeug.wsgi import ClosingIterator
+
+from backend.auth import role_required
+
+
+# ------------------------------------------------------------
+# SAMPLING PROFILER FOR SLOW REQUESTS (opt-in)
+# ------------------------------------------------------------
+# Enabled with PROFILING=1. A WSGI middleware around app.wsgi_app picks
+# requests to profile:
+#
+#   PROFILE_SAMPLE_RATE   fraction of requests always kept (0.0)
+#   PROFILE_SLOW_MS       keep any request slower than this (0 = off)
+#   X-Debug-Profile       signed header, see /api/admin/profiles/token
+#   PROFILE_ENDPOINTS     comma-separated endpoint names to consider,
+#                         e.g. "api_myorders,api_cart_add" (empty = all)
+#
+# One background thread samples the Python stacks of the threads serving
+# candidate requests every PROFILE_INTERVAL_MS (sys._current_frames), so
+# there is no tracing overhead in the request itself. Profiles are stored
+# as collapsed stacks (flamegraph.pl / speedscope input) in PROFILE_DIR,
+# keeping only the newest PROFILE_MAX_FILES files.
+
+PROFILE_HEADER = "X-Debug-Profile"
+_TOKEN_SALT = "debug-profile"
+_PROFILE_ID = re.compile(r"^[0-9]+-[0-9]+-[0-9]+$")
+
+
+class Profile:
+    __slots__ = ("ident", "started", "samples", "stacks")
+
+    def __init__(self, ident):
+        self.ident = ident
+        self.started = time.perf_counter()
+        self.samples = 0
+        self.stacks = Counter()
+
+
+def _frame_label(code):
+    parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    return f"{'/'.join(parts[-2:])}:{code.co_name}"
+
+
+def _collapse(frame):
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples the stacks of registered threads from one daemon thread."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, ident):
+        profile = Profile(ident)
+        with self._lock:
+            self._active[ident] = profile
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return profile
+
+    def stop(self, profile):
+        with self._lock:
+            if self._active.get(profile.ident) is profile:
+                del self._active[profile.ident]
+
+    def _run(self):
+        while True:
+            # Clear before looking: a start() after this point sets it again,
+            # so the wait below cannot miss it
+            self._wakeup.clear()
+            with self._lock:
+                active = list(self._active.values())
+            if not active:
+                self._wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            for profile in active:
+                frame = frames.get(profile.ident)
+                if frame is not None:
+                    profile.stacks[_collapse(frame)] += 1
+                    profile.samples += 1
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of profiles, shared by all workers."""
+
+    def __init__(self, directory, max_files):
+        self.directory = directory
+        self.max_files = max_files
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def _files(self):
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith(".json")]
+        except FileNotFoundError:
+            return []
+        return sorted(names, key=lambda n: [int(p) for p in n[:-5].split("-")])
+
+    def save(self, meta, stacks):
+        with self._lock:
+            self._seq += 1
+            profile_id = f"{int(time.time() * 1000)}-{os.getpid()}-{self._seq}"
+
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, profile_id + ".json")
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(dict(meta, id=profile_id, stacks=dict(stacks.most_common())), f)
+        os.replace(tmp, path)
+
+        for name in self._files()[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+        return profile_id
+
+    def list(self):
+        out = []
+        for name in reversed(self._files()):
+            data = self.load(name[:-5])
+            if data is not None:
+                data.pop("stacks", None)
+                out.append(data)
+        return out
+
+    def load(self, profile_id):
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        try:
+            with open(os.path.join(self.directory, profile_id + ".json")) as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+
+def _token_serializer(app):
+    return URLSafeTimedSerializer(app.config["SECRET_KEY"], salt=_TOKEN_SALT)
+
+
+class ProfilingMiddleware:
+    def __init__(self, wsgi_app, app):
+        self.wsgi_app = wsgi_app
+        self.app = app
+        config = app.config
+        self.sample_rate = float(config.get("PROFILE_SAMPLE_RATE", 0.0))
+        self.slow = float(config.get("PROFILE_SLOW_MS", 0)) / 1000.0
+        self.endpoints = {e.strip() for e in config.get("PROFILE_ENDPOINTS", "").split(",") if e.strip()}
+        self.token_max_age = int(config.get("PROFILE_TOKEN_MAX_AGE", 3600))
+        self.sampler = StackSampler(float(config.get("PROFILE_INTERVAL_MS", 5)) / 1000.0)
+        self.store = app.extensions["profile_store"]
+
+    def _endpoint(self, environ):
+        try:
+            return self.app.url_map.bind_to_environ(environ).match()[0]
+        except HTTPException:
+            return None
+
+    def _signed(self, environ):
+        token = environ.get("HTTP_X_DEBUG_PROFILE")
+        if not token:
+            return False
+        try:
+            _token_serializer(self.app).loads(token, max_age=self.token_max_age)
+        except BadSignature:
+            return False
+        return True
+
+    def __call__(self, environ, start_response):
+        endpoint = self._endpoint(environ)
+        if self.endpoints and endpoint not in self.endpoints:
+            return self.wsgi_app(environ, start_response)
+
+        if self._signed(environ):
+            trigger = "header"
+        elif self.sample_rate and random.random() < self.sample_rate:
+            trigger = "sample"
+        elif self.slow:
+            trigger = None  # decided once the response is finished
+        else:
+            return self.wsgi_app(environ, start_response)
+
+        profile = self.sampler.start(threading.get_ident())
+        status = []
+
+        def _start_response(code, headers, exc_info=None):
+            status.append(int(code.split(" ", 1)[0]))
+            return start_response(code, headers, exc_info)
+
+        def finish():
+            self.sampler.stop(profile)
+            duration = time.perf_counter() - profile.started
+            reason = trigger or ("slow" if duration >= self.slow else None)
+            if reason is None or not profile.samples:
+                return
+            self.store.save({
+                "method": environ.get("REQUEST_METHOD"),
+                "path": environ.get("PATH_INFO"),
+                "query": environ.get("QUERY_STRING", ""),
+                "endpoint": endpoint,
+                "status": status[0] if status else None,
+                "duration_ms": round(duration * 1000, 2),
+                "samples": profile.samples,
+                "interval_ms": self.sampler.interval * 1000,
+                "trigger": reason,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "pid": os.getpid(),
+            }, profile.stacks)
+
+        try:
+            body = self.wsgi_app(environ, _start_response)
+        except BaseException:
+            finish()
+            raise
+        # Streamed bodies are profiled until the server closes them
+        return ClosingIterator(body, finish)
+
+
+def init_profiling(app):
+    """Wrap app.wsgi_app when app.config["PROFILING"] is set."""
+    if not app.config.get("PROFILING"):
+        return
+
+    app.extensions["profile_store"] = ProfileStore(
+        app.config.get("PROFILE_DIR") or os.path.join(app.instance_path, "profiles"),
+        int(app.config.get("PROFILE_MAX_FILES", 50)),
+    )
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app, app)
+
+    @app.route("/api/admin/profiles", methods=["GET"])
+    @login_required
+    @role_required(["admin"])
+    def api_profiles():
+        return jsonify(current_app.extensions["profile_store"].list())
+
+    @app.route("/api/admin/profiles/token", methods=["POST"])
+    @login_required
+    @role_required(["admin"])
+    def api_profile_token():
+        # Send as X-Debug-Profile to profile that request regardless of sampling
+        token = _token_serializer(current_app).dumps({"by": current_user.username})
+        return jsonify({"header": PROFILE_HEADER, "token": token,
+                        "max_age": int(current_app.config.get("PROFILE_TOKEN_MAX_AGE", 3600))})
+
+    @app.route("/api/admin/profiles/<profile_id>", methods=["GET"])
+    @login_required
+    @role_required(["admin"])
+    def api_profile_download(profile_id):
+        data = current_app.extensions["profile_store"].load(profile_id)
+        if data is None:
+            abort(404)
+
+        if request.args.get("format") == "folded":
+            body = "".join(f"{stack} {count}\n" for stack, count in data["stacks"].items())
+            mimetype, ext = "text/plain", "folded"
+        else:
+            body, mimetype, ext = json.dumps(data), "application/json", "json"
+        return Response(body, mimetype=mimetype, headers={
+            "Content-Disposition": f'attachment; filename="profile-{profile_id}.{ext}"'
+        })
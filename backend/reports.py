@@ -0,0 +1,148 @@
+from sqlalchemy import func, select, union_all
+from sqlalchemy.dialects.sqlite import insert
+
+from backend.models import db, Order, OrderArchive, Restaurant, SalesRollup
+
+
+# ------------------------------------------------------------
+# SALES ROLLUPS
+# ------------------------------------------------------------
+# sales_rollup holds one row per (day, country, restaurant, status) with
+# the number of orders and their revenue. Orders are bucketed by the day
+# they were created. Checkout and cancel move an order between buckets in
+# the same transaction that changes its status, so a report costs one
+# GROUP BY over buckets, whatever the number of orders.
+#
+# `flask db rebuild-rollups` recomputes the table from the orders.
+
+ROLLUP_STATUSES = ("placed", "cancelled")
+GROUP_COLUMNS = {
+    "day": SalesRollup.day,
+    "country": SalesRollup.country,
+    "restaurant": SalesRollup.restaurant_id,
+    "status": SalesRollup.status,
+}
+
+
+class ReportError(ValueError):
+    pass
+
+
+def _bump(conn, day, country, restaurant_id, status, orders, revenue):
+    stmt = insert(SalesRollup).values(
+        day=day, country=country, restaurant_id=restaurant_id, status=status,
+        orders=orders, revenue=revenue
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SalesRollup.day, SalesRollup.country, SalesRollup.restaurant_id, SalesRollup.status],
+        set_={
+            "orders": SalesRollup.orders + stmt.excluded.orders,
+            "revenue": func.round(SalesRollup.revenue + stmt.excluded.revenue, 2),
+        }
+    )
+    conn.execute(stmt)
+
+
+def record_status_change(order, old_status, old_total):
+    """Move `order` from its (old_status, old_total) bucket to its current
+    one. Call in the transaction that changes the order, before commit."""
+    old = (old_status, old_total or 0.0)
+    new = (order.status, order.total or 0.0)
+    # Legacy orders without a country are left out, as in the rebuild
+    # (a NULL key would never hit ON CONFLICT and insert a row each time)
+    if old == new or order.country is None:
+        return
+
+    conn = db.session.connection()
+    day = order.created_at.date()
+    key = (day, order.country, order.restaurant_id)
+    if old_status in ROLLUP_STATUSES:
+        _bump(conn, *key, old_status, -1, -old[1])
+    if order.status in ROLLUP_STATUSES:
+        _bump(conn, *key, order.status, 1, new[1])
+
+
+def rebuild_sales_rollups(conn):
+    """Recompute every bucket from the hot and archived orders. Returns the
+    bucket count."""
+    conn.execute(SalesRollup.__table__.delete())
+    orders = union_all(*(
+        select(
+            func.date(model.created_at).label("day"), model.country, model.restaurant_id,
+            model.status, func.coalesce(model.total, 0).label("total")
+        ).where(model.status.in_(ROLLUP_STATUSES), model.country.is_not(None))
+        for model in (Order, OrderArchive)
+    )).subquery()
+    keys = (orders.c.day, orders.c.country, orders.c.restaurant_id, orders.c.status)
+    rows = (
+        select(*keys, func.count(), func.round(func.sum(orders.c.total), 2))
+        .group_by(*keys)
+    )
+    conn.execute(
+        SalesRollup.__table__.insert().from_select(
+            ["day", "country", "restaurant_id", "status", "orders", "revenue"], rows
+        )
+    )
+    return conn.execute(select(func.count()).select_from(SalesRollup)).scalar()
+
+
+def sales_report(country=None, since=None, until=None, statuses=None, group=("day", "status")):
+    """Aggregate buckets, grouped by any of GROUP_COLUMNS.
+
+    `country` None means every country (admin); `since`/`until` are dates,
+    `until` exclusive.
+    """
+    unknown = set(group) - set(GROUP_COLUMNS)
+    if unknown:
+        raise ReportError("Unknown group: " + ",".join(sorted(unknown)))
+
+    columns = [GROUP_COLUMNS[g].label(g) for g in group]
+    stmt = select(
+        *columns,
+        func.sum(SalesRollup.orders).label("orders"),
+        func.round(func.sum(SalesRollup.revenue), 2).label("revenue"),
+    )
+    if country:
+        stmt = stmt.where(SalesRollup.country == country)
+    if since:
+        stmt = stmt.where(SalesRollup.day >= since)
+    if until:
+        stmt = stmt.where(SalesRollup.day < until)
+    if statuses:
+        stmt = stmt.where(SalesRollup.status.in_(statuses))
+    if group:
+        stmt = stmt.group_by(*columns).order_by(*columns)
+
+    rows = [dict(row._mapping) for row in db.session.execute(stmt)]
+
+    # Drop buckets emptied by cancellations
+    rows = [r for r in rows if r["orders"]]
+    for r in rows:
+        if "day" in r:
+            r["day"] = r["day"].isoformat()
+
+    if "restaurant" in group and rows:
+        ids = {r["restaurant"] for r in rows}
+        names = dict(db.session.execute(
+            select(Restaurant.id, Restaurant.name).where(Restaurant.id.in_(ids))
+        ).all())
+        for r in rows:
+            r["restaurant_name"] = names.get(r["restaurant"])
+    return rows
+
+
+def merge_sales_reports(parts, group):
+    """Combine sales_report() rows read from several shards, summing rows
+    with the same group key."""
+    if len(parts) == 1:
+        return parts[0]
+    merged = {}
+    for rows in parts:
+        for r in rows:
+            key = tuple(r[g] for g in group)
+            if key in merged:
+                merged[key]["orders"] += r["orders"]
+                merged[key]["revenue"] = round(merged[key]["revenue"] + r["revenue"], 2)
+            else:
+                merged[key] = dict(r)
+    return [merged[key] for key in sorted(merged)]
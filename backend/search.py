@@ -0,0 +1,133 @@
+import re
+
+from sqlalchemy import text
+
+from backend.models import db
+
+
+# ------------------------------------------------------------
+# MENU SEARCH (SQLite FTS5)
+# ------------------------------------------------------------
+# menu_search holds one row per menu item (rowid = menu_item.id) with the
+# dish name, restaurant name and country. Triggers on menu_item and
+# restaurant keep it in sync in the writing transaction, whoever writes
+# (ORM, Core bulk inserts, datagen). GET /api/search turns the query into
+# prefix terms over name and restaurant, ranks matches with bm25 (dish
+# name weighs more than restaurant name) and pages with a (score, id)
+# cursor.
+#
+# The caller's country scope is an authorization filter, so it must be
+# exact. The country phrase in the MATCH expression only narrows the
+# candidates cheaply (it also matches "South America" for "America"); the
+# stored country is then compared for equality before the LIMIT, so pages
+# stay full, and the joined restaurant row is checked again as the source
+# of truth.
+
+NAME_WEIGHT = 10.0
+RESTAURANT_WEIGHT = 3.0
+MAX_TERMS = 8
+
+SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS menu_search USING fts5("
+    " name, restaurant, country,"
+    " tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+
+    "CREATE TRIGGER IF NOT EXISTS menu_search_ai AFTER INSERT ON menu_item BEGIN"
+    " INSERT INTO menu_search (rowid, name, restaurant, country)"
+    " SELECT new.id, new.name, r.name, r.country FROM restaurant r WHERE r.id = new.restaurant_id;"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS menu_search_au AFTER UPDATE OF name, restaurant_id ON menu_item BEGIN"
+    " DELETE FROM menu_search WHERE rowid = old.id;"
+    " INSERT INTO menu_search (rowid, name, restaurant, country)"
+    " SELECT new.id, new.name, r.name, r.country FROM restaurant r WHERE r.id = new.restaurant_id;"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS menu_search_ad AFTER DELETE ON menu_item BEGIN"
+    " DELETE FROM menu_search WHERE rowid = old.id;"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS menu_search_restaurant_au AFTER UPDATE OF name, country ON restaurant BEGIN"
+    " UPDATE menu_search SET restaurant = new.name, country = new.country"
+    " WHERE rowid IN (SELECT id FROM menu_item WHERE restaurant_id = new.id);"
+    " END",
+
+    "CREATE TRIGGER IF NOT EXISTS menu_search_restaurant_ad AFTER DELETE ON restaurant BEGIN"
+    " DELETE FROM menu_search WHERE rowid IN (SELECT id FROM menu_item WHERE restaurant_id = old.id);"
+    " END",
+)
+
+# Rank and cut the page inside the index, then join only those rows
+SEARCH_SQL = f"""
+SELECT m.id, m.name, m.price, r.id, r.name, r.country, s.score
+FROM (
+    SELECT id, score FROM (
+        SELECT rowid AS id, bm25(menu_search, {NAME_WEIGHT}, {RESTAURANT_WEIGHT}, 0.0) AS score
+        FROM menu_search
+        WHERE menu_search MATCH :match AND (:country IS NULL OR country = :country)
+    )
+    WHERE score > :after_score OR (score = :after_score AND id > :after_id)
+    ORDER BY score, id
+    LIMIT :limit
+) AS s
+JOIN menu_item m ON m.id = s.id
+JOIN restaurant r ON r.id = m.restaurant_id
+WHERE :country IS NULL OR r.country = :country
+ORDER BY s.score, s.id
+"""
+
+
+def create_search_index(conn):
+    for ddl in SEARCH_DDL:
+        conn.exec_driver_sql(ddl)
+
+
+def rebuild_search_index(conn):
+    """Refill menu_search from the catalog. Returns the row count."""
+    conn.exec_driver_sql("DELETE FROM menu_search")
+    conn.exec_driver_sql(
+        "INSERT INTO menu_search (rowid, name, restaurant, country) "
+        "SELECT m.id, m.name, r.name, r.country "
+        "FROM menu_item m JOIN restaurant r ON r.id = m.restaurant_id"
+    )
+    conn.exec_driver_sql("INSERT INTO menu_search (menu_search) VALUES ('optimize')")
+    return conn.exec_driver_sql("SELECT count(*) FROM menu_search").scalar()
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def match_expression(q, country=None):
+    """FTS5 query for the words in `q` (all required, each a prefix), or
+    None if `q` has no words. `country` only narrows the match; callers
+    still filter on it exactly (search_menu)."""
+    terms = re.findall(r"\w+", q.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    expr = "{name restaurant} : (" + " ".join(_quote(t) + "*" for t in terms) + ")"
+    if country:
+        expr += " AND country : " + _quote(country)
+    return expr
+
+
+def search_menu(match, country=None, after=None, limit=20):
+    """Up to `limit` best matches in `country` (None: every country) after
+    the (score, id) key `after`, as dicts with a "score"."""
+    after_score, after_id = after if after else (float("-inf"), 0)
+    rows = db.session.execute(text(SEARCH_SQL), {
+        "match": match, "country": country, "limit": limit,
+        "after_score": after_score, "after_id": after_id,
+    })
+    return [
+        {
+            "menu_item_id": mid,
+            "name": name,
+            "price": price,
+            "restaurant_id": rid,
+            "restaurant": restaurant,
+            "country": rcountry,
+            "score": score,
+        }
+        for mid, name, price, rid, restaurant, rcountry, score in rows
+    ]
@@ -0,0 +1,284 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import sqlalchemy as sa
+from flask import copy_current_request_context, current_app, g, has_app_context, has_request_context
+from flask_login import current_user
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, func, select
+from sqlalchemy.sql.util import find_tables
+
+
+# ------------------------------------------------------------
+# COUNTRY SHARDING (optional)
+# ------------------------------------------------------------
+# With SHARD_COUNTRIES=India,America every listed country gets its own
+# SQLite file (SHARD_DATABASE_URL, "{shard}" is replaced by the lower-case
+# country name) holding its restaurants, menus, orders, archive, rollups,
+# catalog version and change sequence. Users and payment methods stay in
+# the main database. A write burst in one country then only locks that
+# country's file.
+#
+# Routing: db.session sends statements on SHARDED_TABLES to the shard
+# selected in a context variable. Members and managers are routed to
+# their own country for the whole request; admin routes pick the shard
+# from the restaurant or order id (route_to), or read every shard with
+# fan_out(). Ids of sharded rows carry the shard number in their high
+# bits (shard_base), so an id alone says where the row lives, and ids
+# never collide between shards.
+#
+# One request writes to one shard. Without SHARD_COUNTRIES nothing
+# changes: there is a single database and the shard is always None.
+
+SHARDED_TABLES = frozenset({
+    "restaurant", "menu_item", "order", "order_item", "order_archive",
+    "order_item_archive", "sales_rollup", "catalog_version", "change_sequence",
+})
+SHARD_ID_SHIFT = 40
+
+_current = ContextVar("shard", default=None)
+
+
+class ShardError(RuntimeError):
+    pass
+
+
+def bind_key(shard):
+    return "shard_" + re.sub(r"[^a-z0-9]+", "_", shard.lower())
+
+
+class ShardRoutingSession(Session):
+    """db.session class: statements on sharded tables go to the current
+    shard's engine. A plain Flask-SQLAlchemy session when sharding is off."""
+
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._sharded = has_app_context() and "shards" in current_app.extensions
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._sharded:
+            targets = _targets_shard(mapper, clause)
+            shard = _current.get()
+            if shard is not None and targets is not False:
+                return self._db.engines[bind_key(shard)]
+            if targets:
+                raise ShardError("No shard selected for a country-sharded table")
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _targets_shard(mapper, clause):
+    """True/False if the statement uses sharded tables, None if unknown
+    (text, or a bare session.connection())."""
+    if mapper is not None:
+        return sa.inspect(mapper).local_table.name in SHARDED_TABLES
+    if clause is not None:
+        names = {t.name for t in find_tables(clause, include_crud=True) if hasattr(t, "name")}
+        if names:
+            return bool(names & SHARDED_TABLES)
+    return None
+
+
+# ------------------------------------------------------------
+# CONFIGURATION
+# ------------------------------------------------------------
+def configure_sharding(app):
+    """Add one bind per shard country. Call before db.init_app."""
+    app.config.setdefault("SHARD_COUNTRIES", os.environ.get("SHARD_COUNTRIES", ""))
+    app.config.setdefault("SHARD_DATABASE_URL", os.environ.get("SHARD_DATABASE_URL", "sqlite:///foodapp-{shard}.db"))
+    app.config.setdefault("SHARD_FANOUT_WORKERS", int(os.environ.get("SHARD_FANOUT_WORKERS", 4)))
+
+    shards = [c.strip() for c in app.config["SHARD_COUNTRIES"].split(",") if c.strip()]
+    if not shards:
+        return
+
+    binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+    for shard in shards:
+        url = app.config["SHARD_DATABASE_URL"].format(shard=re.sub(r"[^a-z0-9]+", "_", shard.lower()))
+        binds.setdefault(bind_key(shard), url)
+    app.extensions["shards"] = shards
+
+
+def init_sharding(app):
+    """Route member/manager requests to their country. Call after db.init_app."""
+    if "shards" not in app.extensions:
+        return
+
+    app.extensions["shard_pool"] = ThreadPoolExecutor(
+        max_workers=app.config["SHARD_FANOUT_WORKERS"], thread_name_prefix="shard-fanout"
+    )
+
+    @app.before_request
+    def _route_user_shard():
+        if current_user.is_authenticated and current_user.role != "admin":
+            route_to(shard_for_country(current_user.country))
+
+    @app.teardown_request
+    def _reset_shard(exc):
+        if g.pop("_shard_routed", False):
+            _current.set(None)
+
+    db = app.extensions["sqlalchemy"]
+    if not event.contains(db.session, "before_flush", _assign_shard_ids):
+        event.listen(db.session, "before_flush", _assign_shard_ids)
+
+
+def sharding_enabled():
+    return has_app_context() and "shards" in current_app.extensions
+
+
+def shard_names():
+    """Configured shards, or [None] (the single database) when off."""
+    return list(current_app.extensions["shards"]) if sharding_enabled() else [None]
+
+
+def shards_for(country=None):
+    """Shards holding `country`'s catalog and orders; every shard for None."""
+    if not sharding_enabled():
+        return [None]
+    shards = current_app.extensions["shards"]
+    if country is None:
+        return list(shards)
+    return [country] if country in shards else []
+
+
+def user_shards(user):
+    """Shards `user`'s own listings read: their country's, or all for admins."""
+    if user.role == "admin":
+        return shards_for(None)
+    return [shard_for_country(user.country)]
+
+
+def shard_for_country(country):
+    if not sharding_enabled():
+        return None
+    if country not in current_app.extensions["shards"]:
+        raise ShardError(f"No shard for country {country!r}")
+    return country
+
+
+def shard_for_id(row_id):
+    """Shard holding a restaurant/order id; None if sharding is off or the
+    id belongs to no shard."""
+    if not sharding_enabled():
+        return None
+    try:
+        index = int(row_id) >> SHARD_ID_SHIFT
+    except (TypeError, ValueError):
+        return None
+    shards = current_app.extensions["shards"]
+    return shards[index - 1] if 1 <= index <= len(shards) else None
+
+
+def shard_base(shard):
+    if shard is None:
+        return 0
+    return (current_app.extensions["shards"].index(shard) + 1) << SHARD_ID_SHIFT
+
+
+def shard_engine(shard):
+    db = current_app.extensions["sqlalchemy"]
+    return db.engines[bind_key(shard)] if shard is not None else db.engine
+
+
+def current_shard():
+    return _current.get()
+
+
+@contextmanager
+def use_shard(shard):
+    token = _current.set(shard)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def route_to(shard):
+    """Select `shard` for the rest of the current request."""
+    current = _current.get()
+    if shard is None or current == shard:
+        return
+    if current is not None:
+        raise ShardError("A request can only use one shard")
+    _current.set(shard)
+    g._shard_routed = True
+
+
+def route_to_id(row_id):
+    """route_to() the shard of a restaurant/order id. False if that row
+    cannot be read by this request (no such shard, or another one is in use)."""
+    if not sharding_enabled():
+        return True
+    shard = shard_for_id(row_id)
+    if shard is None:
+        return False
+    try:
+        route_to(shard)
+    except ShardError:
+        return False
+    return True
+
+
+def fan_out(fn, shards):
+    """[fn(shard) for shard in shards], in parallel on the fan-out pool.
+
+    Each call runs in its own request/app context, so with its own
+    db.session; return plain data, not ORM objects.
+    """
+    if len(shards) == 1:
+        with use_shard(shards[0]):
+            return [fn(shards[0])]
+
+    app = current_app._get_current_object()
+
+    def task(shard):
+        def run():
+            with use_shard(shard):
+                return fn(shard)
+        if has_request_context():
+            return copy_current_request_context(run)
+        def with_app():
+            with app.app_context():
+                return run()
+        return with_app
+
+    pool = app.extensions["shard_pool"]
+    futures = [pool.submit(task(shard)) for shard in shards]
+    return [f.result() for f in futures]
+
+
+# ------------------------------------------------------------
+# SHARD-RANGED IDS
+# ------------------------------------------------------------
+def next_ids(conn, table, count=1):
+    """First of `count` fresh ids for `table` in the current shard. Call
+    inside the writing transaction (writes to one file are serialized)."""
+    top = conn.execute(select(func.max(table.c.id))).scalar() or 0
+    return max(top, shard_base(_current.get())) + 1
+
+
+def shard_id_values(table, conn):
+    """{"id": ...} for Core inserts into a sharded table, {} when off."""
+    if not sharding_enabled():
+        return {}
+    return {"id": next_ids(conn, table)}
+
+
+def _assign_shard_ids(session, flush_context, instances):
+    if not getattr(session, "_sharded", False):
+        return
+    pending = {}
+    for obj in session.new:
+        table = getattr(obj, "__table__", None)
+        if table is not None and table.name in SHARDED_TABLES and "id" in table.c and obj.id is None:
+            pending.setdefault(table, []).append(obj)
+
+    conn = session.connection() if pending else None
+    for table, objs in pending.items():
+        start = next_ids(conn, table, len(objs))
+        for offset, obj in enumerate(objs):
+            obj.id = start + offset
+
@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import event
+
+from backend.app import create_app
+from backend.db_init import seed_data
+from backend.migrations import upgrade
+from backend.models import db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """App on a fresh, migrated and seeded SQLite file (WAL, as in
+    production)."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    for name in ("SHARD_COUNTRIES", "INSTRUMENTATION", "PROFILING"):
+        monkeypatch.delenv(name, raising=False)
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        upgrade()
+        seed_data()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def login(app):
+    """login(username) -> test client with a session for that seeded user."""
+    def login(username):
+        client = app.test_client()
+        resp = client.post("/login", data={"username": username, "password": "password"})
+        assert resp.status_code == 302
+        return client
+    return login
+
+
+@pytest.fixture
+def statements(app):
+    """List collecting every SQL statement the app's engine runs."""
+    seen = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(engine, "before_cursor_execute", record)
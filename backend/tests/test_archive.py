@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from backend.archive import archive_orders
+from backend.models import Order, OrderArchive, OrderItem, OrderItemArchive, User, db
+
+
+def _age(app, order_id, days):
+    with app.app_context():
+        db.session.get(Order, order_id).created_at = datetime.utcnow() - timedelta(days=days)
+        db.session.commit()
+
+
+def _archive(app, days=180):
+    with app.app_context():
+        return archive_orders(db.engine, datetime.utcnow() - timedelta(days=days), log=None)
+
+
+def _add(client, restaurant_id, menu_item_id):
+    resp = client.post("/api/cart/add", json={"restaurant_id": restaurant_id, "menu_item_id": menu_item_id})
+    assert resp.status_code == 200
+    return resp.get_json()["order_id"]
+
+
+def _checkout(client, order_id, payment_method_id):
+    resp = client.post("/api/checkout", json={"order_id": order_id, "payment_method_id": payment_method_id})
+    assert resp.status_code == 200
+
+
+def _lines(app, model):
+    with app.app_context():
+        return sorted(db.session.query(model.order_id, model.menu_item_id, model.qty).all())
+
+
+def test_reused_order_item_ids_do_not_break_archiving(app, login):
+    client = login("captain_marvel")
+    pm = client.post("/api/payment-methods", json={"method_name": "Card"}).get_json()["id"]
+
+    # The first cart gets the newest line, then is checked out and archived
+    first = _add(client, 1, 1)
+    second = _add(client, 2, 3)
+    _add(client, 1, 2)
+    _checkout(client, first, pm)
+    _age(app, first, 400)
+    assert _archive(app) == 1
+
+    # SQLite hands the archived max line id out again
+    _add(client, 2, 4)
+    _add(client, 1, 1)
+    _checkout(client, second, pm)
+    _age(app, second, 300)
+    expected = sorted(_lines(app, OrderItem) + _lines(app, OrderItemArchive))
+    assert _archive(app) == 1
+
+    assert _lines(app, OrderItemArchive) + _lines(app, OrderItem) == expected
+    with app.app_context():
+        assert sorted(o.id for o in OrderArchive.query) == [first, second]
+
+
+def test_listing_reads_archive_after_archive_days_change(app, login):
+    now = datetime.utcnow()
+    with app.app_context():
+        uid = User.query.filter_by(username="captain_marvel").one().id
+
+        def order(status, days, restaurant_id):
+            o = Order(user_id=uid, restaurant_id=restaurant_id, status=status, total=0.0,
+                      country="India", added_by="captain_marvel",
+                      created_at=now - timedelta(days=days))
+            db.session.add(o)
+            db.session.flush()
+            return o.id
+
+        archived = order("placed", 200, 1)
+        old_carts = [order("cart", 300, 1), order("cart", 310, 2)]
+        recent = order("placed", 1, 1)
+        db.session.commit()
+
+    assert _archive(app, days=180) == 1
+    # Raised after the run: the archive still holds a 200-day-old order
+    app.config["ORDER_ARCHIVE_DAYS"] = 365
+
+    client = login("captain_marvel")
+    page = client.get("/api/myorders?limit=2").get_json()
+    assert [o["id"] for o in page] == [recent, archived]
+
+    everything = client.get("/api/myorders?limit=10").get_json()
+    assert [o["id"] for o in everything] == [recent, archived] + old_carts
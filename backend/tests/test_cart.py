@@ -0,0 +1,24 @@
+import pytest
+
+
+@pytest.mark.parametrize("body, error", [
+    ({"restaurant_id": 1, "menu_item_id": "abc"}, "Invalid item"),
+    ({"restaurant_id": 1, "menu_item_id": 999}, "Invalid item"),
+    ({"restaurant_id": 1, "menu_item_id": 1, "qty": "two"}, "Invalid qty"),
+    ({"restaurant_id": 1, "menu_item_id": 1, "qty": 0}, "Invalid qty"),
+    ({"restaurant_id": 1}, "Missing fields"),
+])
+def test_cart_add_rejects_bad_input(login, body, error):
+    resp = login("thor").post("/api/cart/add", json=body)
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": error}
+
+
+def test_cart_add_merges_lines(login):
+    client = login("thor")
+    client.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": 1})
+    resp = client.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": "1", "qty": "2"})
+    assert resp.status_code == 200
+    cart = resp.get_json()["cart"]
+    assert [(i["menu_item_id"], i["qty"]) for i in cart["items"]] == [(1, 3)]
+    assert cart["total"] == 3 * cart["items"][0]["price"]
@@ -0,0 +1,23 @@
+from backend.catalog import CatalogCache
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = CatalogCache(max_entries=100, max_bytes=1000)
+    for n in range(5):
+        cache.put(("list", n), 1, b"x" * 300, 300)
+    assert cache.bytes <= 1000
+    assert cache.get(("list", 0), 1) is None
+    assert cache.get(("list", 4), 1) == b"x" * 300
+
+    # Replacing an entry releases its old size
+    cache.put(("list", 4), 2, b"y", 1)
+    assert cache.bytes == 601
+
+
+def test_oversized_entry_is_not_cached():
+    cache = CatalogCache(max_entries=100, max_bytes=1000)
+    cache.put("small", 1, "s", 10)
+    cache.put("huge", 1, "h", 5000)
+    assert cache.get("huge", 1) is None
+    assert cache.get("small", 1) == "s"
+    assert cache.stats()["bytes"] == 10
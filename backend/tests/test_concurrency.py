@@ -0,0 +1,80 @@
+import threading
+
+from sqlalchemy import func
+
+from backend.models import Order, OrderItem, db
+
+
+ROUNDS = 15
+
+
+def test_mutation_takes_the_write_lock_once(login, statements):
+    client = login("thor")
+    client.get("/api/cart")
+    statements.clear()
+
+    resp = client.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": 1})
+    assert resp.status_code == 200
+    begins = [s for s in statements if s.startswith("BEGIN")]
+    # Write transaction, then a plain read for the returned cart
+    assert begins == ["BEGIN IMMEDIATE", "BEGIN"]
+
+
+def test_concurrent_cart_and_checkout(app, login):
+    # Managers add and check out, members only add; all at once
+    shoppers = {
+        "captain_marvel": (1, (1, 2)),
+        "captain_america": (3, (5, 6)),
+        "thor": (2, (3, 4)),
+        "thanos": (1, (1, 2)),
+        "travis": (4, (7, 8)),
+    }
+    clients = {name: login(name) for name in shoppers}
+    payment = {
+        name: clients[name].post("/api/payment-methods", json={"method_name": "Card"}).get_json()["id"]
+        for name in ("captain_marvel", "captain_america")
+    }
+    failures = []
+    barrier = threading.Barrier(len(shoppers))
+
+    def shop(name):
+        client = clients[name]
+        restaurant_id, items = shoppers[name]
+        barrier.wait()
+        for n in range(ROUNDS):
+            resp = client.post("/api/cart/add", json={
+                "restaurant_id": restaurant_id, "menu_item_id": items[n % 2], "qty": n % 3 + 1,
+            })
+            if resp.status_code != 200:
+                failures.append((name, "add", resp.status_code, resp.get_data(as_text=True)))
+                continue
+            if name in payment and n % 3 == 2:
+                resp = client.post("/api/checkout", json={
+                    "order_id": resp.get_json()["order_id"], "payment_method_id": payment[name],
+                })
+                if resp.status_code != 200:
+                    failures.append((name, "checkout", resp.status_code, resp.get_data(as_text=True)))
+
+    threads = [threading.Thread(target=shop, args=(name,)) for name in shoppers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not failures
+
+    with app.app_context():
+        line_totals = dict(
+            db.session.query(OrderItem.order_id, func.sum(OrderItem.qty * OrderItem.unit_price))
+            .group_by(OrderItem.order_id)
+        )
+        orders = Order.query.all()
+        qty = db.session.query(func.sum(OrderItem.qty)).scalar()
+
+    assert orders
+    for order in orders:
+        assert round(order.total, 2) == round(line_totals.get(order.id, 0.0), 2), order.id
+    # Every add landed exactly once
+    assert qty == len(shoppers) * sum(n % 3 + 1 for n in range(ROUNDS))
+    placed = [o for o in orders if o.status == "placed"]
+    assert len(placed) == 2 * (ROUNDS // 3)
@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import func, select
+
+from backend.datagen import DatagenError, generate
+from backend.models import Order, db
+
+
+def _status_counts():
+    with db.engine.connect() as conn:
+        return dict(conn.execute(select(Order.status, func.count()).group_by(Order.status)).all())
+
+
+def test_generated_orders_leave_no_open_carts(app):
+    with app.app_context():
+        before = _status_counts()
+        generate(db.engine, users=20, restaurants=10, menu_items=50, orders=2000, log=None)
+        after = _status_counts()
+    assert after.get("cart", 0) == before.get("cart", 0)
+    assert after["placed"] > before.get("placed", 0)
+    assert after["cancelled"] > before.get("cancelled", 0)
+
+
+def test_orders_without_users_are_refused(app):
+    with app.app_context():
+        with pytest.raises(DatagenError):
+            generate(db.engine, users=0, orders=10, log=None)
+
+
+def test_orders_without_an_orderable_restaurant_are_refused(app):
+    # With this seed the only restaurant lands in the country without users
+    with app.app_context():
+        with pytest.raises(DatagenError):
+            generate(db.engine, countries=2, users=1, restaurants=1, menu_items=1, orders=1, seed=1, log=None)
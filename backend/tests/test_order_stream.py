@@ -0,0 +1,40 @@
+import threading
+
+
+def _limit_streams(app, count):
+    app.config["ORDER_STREAM_MAX"] = count
+    app.extensions["order_streams"] = threading.BoundedSemaphore(max(count, 1))
+
+
+def test_streams_are_capped_per_worker(app, login):
+    _limit_streams(app, 1)
+    client = login("thor")
+
+    first = client.get("/api/orders/stream", buffered=False)
+    assert first.status_code == 200
+
+    refused = client.get("/api/orders/stream")
+    assert refused.status_code == 503
+    assert refused.headers["Retry-After"]
+
+    # Closing the stream frees its slot
+    first.close()
+    again = client.get("/api/orders/stream", buffered=False)
+    assert again.status_code == 200
+    again.close()
+
+
+def test_no_streams_without_spare_threads(app, login):
+    _limit_streams(app, 0)
+    assert login("thor").get("/api/orders/stream").status_code == 503
+
+
+def test_polling_fallback_returns_changes(login):
+    client = login("thor")
+    seq = client.get("/api/myorders").headers["X-Change-Seq"]
+    client.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": 1})
+
+    resp = client.get(f"/api/myorders?since={seq}")
+    assert resp.status_code == 200
+    assert [o["restaurant_id"] for o in resp.get_json()] == [1]
+    assert int(resp.headers["X-Change-Seq"]) > int(seq)
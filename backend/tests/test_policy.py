@@ -0,0 +1,74 @@
+import pytest
+from sqlalchemy import select, update
+
+from backend.models import Order, User, db
+
+# Seeded users: nick (admin, India), captain_marvel (manager, India),
+# captain_america (manager, America), thor (member, India), travis
+# (member, America).
+
+
+def _restaurants(client):
+    return {r["name"]: r for r in client.get("/api/restaurants").get_json()}
+
+
+def _india_cart(login, username="thor"):
+    client = login(username)
+    spice = _restaurants(client)["Spice India"]
+    resp = client.post("/api/cart/add", json={"restaurant_id": spice["id"], "menu_item_id": spice["menu"][0]["id"]})
+    assert resp.status_code == 200
+    return resp.get_json()["order_id"]
+
+
+def _give_order(app, order_id, username):
+    with app.app_context(), db.engine.begin() as conn:
+        user_id = conn.execute(select(User.id).where(User.username == username)).scalar()
+        conn.execute(update(Order).where(Order.id == order_id).values(user_id=user_id))
+
+
+@pytest.mark.parametrize("username", ["captain_america", "travis"])
+def test_other_countries_are_not_listed(login, username):
+    order_id = _india_cart(login)
+    client = login(username)
+
+    assert order_id not in {o["id"] for o in client.get("/api/myorders").get_json()}
+    assert {r["country"] for r in client.get("/api/restaurants").get_json()} == {"America"}
+
+
+def test_member_cannot_order_from_another_country(login):
+    client = login("travis")
+    spice = _restaurants(login("nick"))["Spice India"]
+    resp = client.post("/api/cart/add", json={"restaurant_id": spice["id"], "menu_item_id": spice["menu"][0]["id"]})
+    assert resp.status_code == 404
+
+
+def test_manager_cannot_cancel_another_countrys_order(app, login):
+    order_id = _india_cart(login)
+    resp = login("captain_america").post(f"/api/order/{order_id}/cancel")
+    assert resp.status_code == 404
+    assert resp.get_json() == {"error": "Not found"}
+    with app.app_context(), db.engine.connect() as conn:
+        assert conn.execute(select(Order.status).where(Order.id == order_id)).scalar() == "cart"
+
+
+def test_manager_cannot_check_out_another_countrys_order(app, login):
+    # Owned by the American manager but in India: only the policy stops it
+    order_id = _india_cart(login, "captain_marvel")
+    _give_order(app, order_id, "captain_america")
+    pm_id = login("nick").get("/api/payment-methods").get_json()[0]["id"]
+
+    resp = login("captain_america").post("/api/checkout", json={"order_id": order_id, "payment_method_id": pm_id})
+    assert resp.status_code == 404
+    assert resp.get_json() == {"error": "Order not found"}
+    with app.app_context(), db.engine.connect() as conn:
+        assert conn.execute(select(Order.status).where(Order.id == order_id)).scalar() == "cart"
+
+
+def test_admin_is_not_scoped(login):
+    india_order = _india_cart(login)
+    client = login("nick")
+
+    listed = {o["id"] for o in client.get("/api/myorders?all=1").get_json()}
+    assert india_order in listed
+    assert {r["country"] for r in client.get("/api/restaurants").get_json()} == {"India", "America"}
+    assert client.post(f"/api/order/{india_order}/cancel").status_code == 200
@@ -0,0 +1,43 @@
+import threading
+import time
+
+from backend.profiling import StackSampler
+
+
+class RacingLock:
+    """Lock that runs `after_release` once, right after the first release:
+    a start() landing between the sampler's empty read and its wait."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.after_release = None
+
+    def __enter__(self):
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+        hook, self.after_release = self.after_release, None
+        if hook:
+            hook()
+
+
+def test_start_during_idle_check_is_not_lost():
+    sampler = StackSampler(interval=0.001)
+    sampler._lock = RacingLock()
+    ident = threading.get_ident()
+    profile = None
+
+    def start():
+        nonlocal profile
+        profile = sampler.start(ident)
+
+    sampler._lock.after_release = start
+    sampler._thread = threading.Thread(target=sampler._run, daemon=True)
+    sampler._thread.start()
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and not (profile and profile.samples):
+        time.sleep(0.01)
+    assert profile is not None and profile.samples > 0
+    sampler.stop(profile)
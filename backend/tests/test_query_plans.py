@@ -0,0 +1,77 @@
+from sqlalchemy import event
+
+from backend.models import db
+
+
+# Index each hot lookup must use (backend/models.py, migrations 1-2)
+EXPECTED_INDEXES = {
+    "cart lookup": "ix_order_user_status_restaurant",
+    "restaurants by country": "ix_restaurant_country_id",
+    "menus by restaurant": "ix_menu_item_restaurant_id",
+    "order lines by order": "uq_order_item_order_menu_item",
+    "orders by country": "ix_order_country_created",
+    "orders by user": "ix_order_user_created",
+    "payment methods by user": "ix_payment_method_user_id",
+}
+
+
+def _capture(app, run):
+    """Run `run()` and return the (statement, parameters) of its queries."""
+    seen = []
+    with app.app_context():
+        engine = db.engine
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            seen.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return seen
+
+
+def _plans(app, queries):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            return [
+                (statement, [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)])
+                for statement, parameters in queries
+            ]
+
+
+def _hot_requests(login):
+    manager = login("captain_marvel")
+    admin = login("nick")
+    member = login("thor")
+
+    def run():
+        resp = manager.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": 1, "qty": 2})
+        order_id = resp.get_json()["order_id"]
+        manager.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": 2})
+        pm = manager.post("/api/payment-methods", json={"method_name": "Card"}).get_json()["id"]
+        manager.get("/api/cart")
+        manager.get("/api/payment-methods")
+        manager.post("/api/checkout", json={"order_id": order_id, "payment_method_id": pm})
+        manager.get("/api/myorders")
+        admin.get("/api/myorders")
+        member.get("/api/restaurants")
+        member.get("/api/restaurants?limit=1")
+        member.post("/api/cart/add", json={"restaurant_id": 2, "menu_item_id": 3})
+        member.get("/api/myorders")
+    return run
+
+
+def test_hot_queries_use_indexes(app, login):
+    plans = _plans(app, _capture(app, _hot_requests(login)))
+    assert plans
+
+    for statement, details in plans:
+        scans = [d for d in details if d.startswith("SCAN ") and "INDEX" not in d]
+        assert not scans, f"{scans} in plan of:\n{statement}"
+
+    used = " ".join(d for _, details in plans for d in details)
+    for lookup, index in EXPECTED_INDEXES.items():
+        assert index in used, f"{lookup} does not use {index}"
@@ -0,0 +1,25 @@
+from sqlalchemy import select, update
+
+from backend.models import Order, SalesRollup, db
+from backend.reports import rebuild_sales_rollups
+
+
+def _rollups(app):
+    with app.app_context(), db.engine.connect() as conn:
+        return sorted(conn.execute(select(SalesRollup.__table__)).all())
+
+
+def test_orders_without_country_stay_out_of_live_rollups(app, login):
+    client = login("nick")
+    order_id = client.post("/api/cart/add", json={"restaurant_id": 1, "menu_item_id": 1}).get_json()["order_id"]
+    with app.app_context(), db.engine.begin() as conn:
+        conn.execute(update(Order).where(Order.id == order_id).values(country=None))
+
+    pm = client.get("/api/payment-methods").get_json()
+    assert client.post("/api/checkout", json={"order_id": order_id, "payment_method_id": pm[0]["id"]}).status_code == 200
+    assert client.post(f"/api/order/{order_id}/cancel").status_code == 200
+
+    live = _rollups(app)
+    with app.app_context(), db.engine.begin() as conn:
+        rebuild_sales_rollups(conn)
+    assert live == _rollups(app)
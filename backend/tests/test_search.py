@@ -0,0 +1,45 @@
+import pytest
+
+from backend.models import MenuItem, Restaurant, db
+
+
+@pytest.fixture
+def empanadas(app):
+    """Empanada dishes in America and in "South America"."""
+    with app.app_context():
+        ids = {}
+        for country, name in (("South America", "Casa Sur"), ("America", "Empanada Bar"), ("India", "Spice Hut")):
+            r = Restaurant(name=name, country=country)
+            db.session.add(r)
+            db.session.flush()
+            db.session.add(MenuItem(restaurant_id=r.id, name="Beef Empanada", price=4.0))
+            ids[country] = r.id
+        db.session.commit()
+    return ids
+
+
+def _countries(client, url):
+    resp = client.get(url)
+    assert resp.status_code == 200
+    return [row["country"] for row in resp.get_json()]
+
+
+def test_country_scope_is_exact(login, empanadas):
+    assert _countries(login("captain_america"), "/api/search?q=empanada") == ["America"]
+    assert _countries(login("travis"), "/api/search?q=empanada") == ["America"]
+    assert _countries(login("nick"), "/api/search?q=empanada&country=America") == ["America"]
+    assert sorted(_countries(login("nick"), "/api/search?q=empanada")) == ["America", "India", "South America"]
+
+
+def test_scoped_pages_stay_full(login, empanadas):
+    client = login("nick")
+    first = client.get("/api/search?q=empanada&country=South America&limit=1")
+    assert [r["country"] for r in first.get_json()] == ["South America"]
+    assert "X-Next-Cursor" not in first.headers
+
+
+def test_search_follows_restaurant_country_changes(app, login, empanadas):
+    with app.app_context():
+        db.session.get(Restaurant, empanadas["South America"]).country = "America"
+        db.session.commit()
+    assert _countries(login("captain_america"), "/api/search?q=empanada") == ["America", "America"]
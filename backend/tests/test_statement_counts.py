@@ -0,0 +1,30 @@
+import pytest
+
+from backend.datagen import generate
+from backend.models import db
+
+
+def _count(statements, client, url):
+    statements.clear()
+    resp = client.get(url)
+    assert resp.status_code == 200
+    return len(statements), len(resp.get_json())
+
+
+@pytest.mark.parametrize("user, url", [
+    ("nick", "/api/restaurants"),
+    ("nick", "/api/restaurants?country=India"),
+    ("thor", "/api/restaurants"),
+    ("thor", "/api/restaurants?fields=id,name,menu&limit=50"),
+])
+def test_restaurant_listing_statements_do_not_grow(app, login, statements, user, url):
+    client = login(user)
+    client.get("/api/cart")  # load the user into the principal cache
+    small, small_rows = _count(statements, client, url)
+
+    with app.app_context():
+        generate(db.engine, restaurants=300, menu_items=3000, orders=0, log=None)
+
+    large, large_rows = _count(statements, client, url)
+    assert large_rows > small_rows
+    assert large == small
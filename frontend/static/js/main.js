@@ -69,23 +69,12 @@ async function loadRestaurants() {
 
     container.innerHTML = "";
 
-    // 🔥 Hardcoded images for each restaurant
-    const images = [
-      "/static/img/rest1.jpg",
-      "/static/img/rest2.jpg",
-      "/static/img/rest3.jpg",
-      "/static/img/rest4.jpg",
-      "/static/img/rest5.jpg",
-      "/static/img/rest6.jpg"
-    ];
+    // Card images (fingerprinted thumbnails), set by layout.html
+    const images = window.RESTAURANT_IMAGES;
 
+    // The API only returns restaurants in the user's scope
     restaurants.forEach((r, index) => {
 
-      // UI-level country restriction
-      if (window.USER_ROLE !== "admin" && r.country !== window.USER_COUNTRY) {
-        return;
-      }
-
       // Pick the image (loops if restaurants > images)
       const imgSrc = images[index % images.length];
 
@@ -117,29 +106,63 @@ async function loadRestaurants() {
 }
 
 /************************************************************
-  ADD TO CART
+  ADD TO CART (debounced into /api/cart/batch)
 ************************************************************/
-async function addToCart(restaurantId, itemId) {
+const CART_BATCH_DELAY_MS = 300;
+let PENDING_CART_OPS = {};
+let CART_FLUSH_TIMER = null;
+
+function addToCart(restaurantId, itemId) {
+  // Merge rapid clicks on the same item into one "add" op
+  const key = `${restaurantId}:${itemId}`;
+  const op = PENDING_CART_OPS[key] || {
+    op: "add",
+    restaurant_id: restaurantId,
+    menu_item_id: itemId,
+    qty: 0
+  };
+  op.qty += 1;
+  PENDING_CART_OPS[key] = op;
+
+  clearTimeout(CART_FLUSH_TIMER);
+  CART_FLUSH_TIMER = setTimeout(flushCart, CART_BATCH_DELAY_MS);
+}
+
+async function flushCart() {
+  const ops = Object.values(PENDING_CART_OPS);
+  PENDING_CART_OPS = {};
+  CART_FLUSH_TIMER = null;
+  if (!ops.length) return;
+
   try {
-    await fetch("/api/cart/add", {
+    const res = await fetch("/api/cart/batch", {
       method: "POST",
       headers: {"Content-Type": "application/json"},
-      body: JSON.stringify({
-        restaurant_id: restaurantId,
-        menu_item_id: itemId,
-        qty: 1
-      })
+      body: JSON.stringify({ ops })
     });
+    const data = await res.json();
+    if (!res.ok) {
+      alert(data.error || "Could not update cart.");
+      return;
+    }
+    upsertOrders(data.carts);
   } catch (e) {
     console.error(e);
   }
-
-  loadOrders();
 }
 
 /************************************************************
   LOAD ORDERS / CART
+  Orders are kept in a local store; mutations return the
+  changed orders, which are merged in without a refetch.
 ************************************************************/
+const ORDERS = new Map();
+let LAST_CHANGE_SEQ = null;
+let ORDER_STREAM = null;
+// /api/myorders pages newest first; older pages load on demand
+let ORDERS_NEXT_CURSOR = null;
+let ORDERS_LOADING_MORE = false;
+
 async function loadOrders() {
   const box = document.getElementById("myorders");
   if (!box) return;
@@ -150,48 +173,157 @@ async function loadOrders() {
     const res = await fetch("/api/myorders");
     const orders = await res.json();
 
-    if (!orders.length) {
-      box.innerHTML = "No orders yet.";
-      return;
+    ORDERS.clear();
+    ORDERS_NEXT_CURSOR = res.headers.get("X-Next-Cursor");
+    upsertOrders(orders);
+
+    LAST_CHANGE_SEQ = res.headers.get("X-Change-Seq");
+    watchOrderChanges();
+
+  } catch (e) {
+    box.innerHTML = "Error loading orders.";
+    console.error(e);
+  }
+}
+
+async function loadMoreOrders() {
+  if (!ORDERS_NEXT_CURSOR || ORDERS_LOADING_MORE) return;
+  ORDERS_LOADING_MORE = true;
+
+  try {
+    const res = await fetch(`/api/myorders?cursor=${encodeURIComponent(ORDERS_NEXT_CURSOR)}`);
+    if (res.ok) {
+      const orders = await res.json();
+      // Absent on the last page
+      ORDERS_NEXT_CURSOR = res.headers.get("X-Next-Cursor");
+      upsertOrders(orders);
     }
+  } catch (e) {
+    console.error(e);
+  } finally {
+    ORDERS_LOADING_MORE = false;
+  }
+}
 
-    box.innerHTML = "";
+function upsertOrders(orders) {
+  (orders || []).forEach(o => ORDERS.set(o.id, o));
+  renderOrders();
+}
 
-    orders.forEach(o => {
-      const div = document.createElement("div");
-      div.className = "order-item";
+function renderOrders() {
+  const box = document.getElementById("myorders");
+  if (!box) return;
 
-      const currency = getCurrency(o.country || window.USER_COUNTRY);
+  // Newest first, matching /api/myorders
+  const orders = Array.from(ORDERS.values()).sort((a, b) =>
+    a.created_at === b.created_at ? b.id - a.id : (a.created_at < b.created_at ? 1 : -1)
+  );
 
-      div.innerHTML = `
-        <div>
-          <div class="meta">Order #${o.id}</div>
-          <div class="meta">${o.items.map(i => `${i.name} x${i.qty}`).join(", ")}</div>
-          <div class="meta">Added by: ${o.added_by || "Unknown"}</div>
-          ${o.cancelled_by ? `<div class="meta">Cancelled by: ${o.cancelled_by}</div>` : ""}
+  if (!orders.length) {
+    box.innerHTML = "No orders yet.";
+    return;
+  }
 
-          <div class="meta">${currency}${o.total}</div>
-        </div>
+  box.innerHTML = "";
+
+  orders.forEach(o => {
+    const div = document.createElement("div");
+    div.className = "order-item";
+
+    const currency = getCurrency(o.country || window.USER_COUNTRY);
+
+    div.innerHTML = `
+      <div>
+        <div class="meta">Order #${o.id}</div>
+        <div class="meta">${o.items.map(i => `${i.name} x${i.qty}`).join(", ")}</div>
+        <div class="meta">Added by: ${o.added_by || "Unknown"}</div>
+        ${o.cancelled_by ? `<div class="meta">Cancelled by: ${o.cancelled_by}</div>` : ""}
+
+        <div class="meta">${currency}${o.total}</div>
+      </div>
+
+      <div>
+        ${
+          o.status !== "cancelled" &&
+          window.USER_ROLE !== "member"
+            ? `<button class="btn-small btn-ghost" onclick="cancelOrder(${o.id})">Cancel</button>`
+            : `<span class="meta">(${o.status})</span>`
+        }
+      </div>
+    `;
+
+    box.appendChild(div);
+  });
+
+  if (ORDERS_NEXT_CURSOR) {
+    const more = document.createElement("button");
+    more.className = "btn-small btn-ghost";
+    more.innerText = "Load older orders";
+    more.onclick = loadMoreOrders;
+    box.appendChild(more);
+  }
+}
 
-        <div>
-          ${
-            o.status !== "cancelled" &&
-            window.USER_ROLE !== "member"
-              ? `<button class="btn-small btn-ghost" onclick="cancelOrder(${o.id})">Cancel</button>`
-              : `<span class="meta">(${o.status})</span>`
-          }
-        </div>
-      `;
+/************************************************************
+  LIVE ORDER UPDATES
+  The server pushes changed orders over SSE; the browser
+  reconnects on its own and resumes from Last-Event-ID.
+  Streams are capped per server worker: when the server
+  refuses one (503), the page polls /api/myorders?since=
+  and tries the stream again after each poll. Nothing runs
+  while the tab is hidden.
+************************************************************/
+const ORDER_POLL_MS = 15000;
+let ORDER_POLL_TIMER = null;
 
-      box.appendChild(div);
-    });
+function watchOrderChanges() {
+  if (ORDER_STREAM || ORDER_POLL_TIMER || LAST_CHANGE_SEQ === null || document.hidden) return;
 
-  } catch (e) {
-    box.innerHTML = "Error loading orders.";
-    console.error(e);
+  if (!window.EventSource) {
+    ORDER_POLL_TIMER = setTimeout(pollOrderChanges, ORDER_POLL_MS);
+    return;
   }
+
+  ORDER_STREAM = new EventSource(`/api/orders/stream?since=${LAST_CHANGE_SEQ}`);
+  ORDER_STREAM.addEventListener("order", ev => {
+    LAST_CHANGE_SEQ = ev.lastEventId;
+    upsertOrders([JSON.parse(ev.data)]);
+  });
+  ORDER_STREAM.onerror = () => {
+    // Refused or failed for good (the browser does not retry): poll
+    if (ORDER_STREAM.readyState === EventSource.CLOSED) {
+      ORDER_STREAM = null;
+      ORDER_POLL_TIMER = setTimeout(pollOrderChanges, ORDER_POLL_MS);
+    }
+  };
 }
 
+function stopWatchingOrders() {
+  if (ORDER_STREAM) ORDER_STREAM.close();
+  ORDER_STREAM = null;
+  clearTimeout(ORDER_POLL_TIMER);
+  ORDER_POLL_TIMER = null;
+}
+
+async function pollOrderChanges() {
+  try {
+    const res = await fetch(`/api/myorders?since=${LAST_CHANGE_SEQ}`);
+    if (res.ok) {
+      upsertOrders(await res.json());
+      LAST_CHANGE_SEQ = res.headers.get("X-Change-Seq") || LAST_CHANGE_SEQ;
+    }
+  } catch (e) { console.error(e); }
+
+  ORDER_POLL_TIMER = null;
+  watchOrderChanges();
+}
+
+// Free the server's stream slot while the tab is in the background
+document.addEventListener("visibilitychange", () => {
+  if (document.hidden) stopWatchingOrders();
+  else watchOrderChanges();
+});
+
 /************************************************************
   CANCEL ORDER
 ************************************************************/
@@ -202,10 +334,10 @@ async function cancelOrder(orderId) {
   }
 
   try {
-    await fetch(`/api/order/${orderId}/cancel`, { method: "POST" });
+    const res = await fetch(`/api/order/${orderId}/cancel`, { method: "POST" });
+    const data = await res.json();
+    if (res.ok) upsertOrders([data.order]);
   } catch (e) { console.error(e); }
-
-  loadOrders();
 }
 
 /************************************************************
@@ -220,10 +352,11 @@ async function openCheckoutCart() {
   }
 
   try {
-    const res = await fetch("/api/myorders");
-    const orders = await res.json();
+    // Only this user's open carts, not the whole order history
+    const res = await fetch("/api/cart");
+    const carts = await res.json();
 
-    const cart = orders.find(o => o.status === "cart");
+    const cart = carts.find(o => o.items.length);
 
     if (!cart) return alert("Your cart is empty.");
 
@@ -255,7 +388,7 @@ async function submitPayment() {
   const pmId = document.getElementById("payment-selector").value;
 
   try {
-    await fetch("/api/checkout", {
+    const res = await fetch("/api/checkout", {
       method: "POST",
       headers: {"Content-Type": "application/json"},
       body: JSON.stringify({
@@ -263,10 +396,12 @@ async function submitPayment() {
         payment_method_id: pmId
       })
     });
+    const data = await res.json();
+    if (res.ok) upsertOrders([data.order]);
+    else alert(data.error || "Checkout failed.");
   } catch (e) { console.error(e); }
 
   closeModal();
-  loadOrders();
 }
 
 function closeModal() {
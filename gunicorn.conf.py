@@ -0,0 +1,13 @@
+# gunicorn.conf.py — picked up automatically by `gunicorn` from the repo root
+import os
+
+bind = "0.0.0.0:" + os.environ.get("PORT", "8000")
+
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+
+# Threaded workers keep the SSE order stream from tying up a whole worker;
+# at most a quarter of the threads stream (ORDER_STREAM_MAX), the rest
+# always serve API requests.
+# backend/database.py sizes each worker's connection pool from this value.
+threads = int(os.environ.setdefault("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"